@@ -0,0 +1,192 @@
+import argparse
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.config import get_settings, configure_logging
+from app.services import workers
+
+logger = logging.getLogger(__name__)
+
+Chunk = Tuple[int, int, List[bytes]]
+
+SLOT_POLL_SECONDS = 0.1
+
+
+def _init_bulk_worker() -> None:
+    # Parallelism comes from the pool itself; nested spaCy multiprocessing
+    # is not allowed inside daemonic pool workers.
+    settings = get_settings().model_copy(update={"nlp_n_process": 1})
+    workers.register_services(workers.load_services(settings))
+
+
+def _process_chunk(args: Tuple[List[bytes], str, str]) -> List[bytes]:
+    return workers.translation_anonymize_lines(*args)
+
+
+def _iter_chunks(data: mmap.mmap, start: int, chunk_lines: int) -> Iterator[Chunk]:
+    size = len(data)
+    position = start
+    while position < size:
+        chunk_start = position
+        lines: List[bytes] = []
+        while position < size and len(lines) < chunk_lines:
+            end = data.find(b"\n", position)
+            if end == -1:
+                end = size
+            lines.append(data[position:end])
+            position = end + 1
+        yield chunk_start, min(position, size), lines
+
+
+def _bounded(
+    chunks: Iterator[Chunk], slots: threading.BoundedSemaphore, stop: threading.Event, fmt: str, language: str
+):
+    # Runs in the pool's task-handler thread, which pool.terminate() joins:
+    # waiting for a slot polls `stop` so a failing run() can't hang there.
+    for chunk_start, chunk_end, lines in chunks:
+        while not slots.acquire(timeout=SLOT_POLL_SECONDS):
+            if stop.is_set():
+                return
+        yield (chunk_start, chunk_end, len(lines)), (lines, fmt, language)
+
+
+def _load_checkpoint(path: str) -> Optional[Dict[str, int]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path: str, checkpoint: Dict[str, int]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def run(
+    input_path: str,
+    output_path: str,
+    fmt: str,
+    language: str,
+    processes: int,
+    chunk_lines: int,
+    checkpoint_path: str,
+    resume: bool,
+    report_interval: float,
+) -> Dict[str, Any]:
+    checkpoint = {"input_offset": 0, "output_offset": 0, "lines": 0}
+    if resume and os.path.exists(output_path):
+        checkpoint = _load_checkpoint(checkpoint_path) or checkpoint
+        if checkpoint["input_offset"]:
+            logger.info(
+                f"Resuming at input byte {checkpoint['input_offset']} "
+                f"({checkpoint['lines']} lines already written)"
+            )
+
+    total_bytes = os.path.getsize(input_path)
+    mode = "r+b" if checkpoint["output_offset"] else "wb"
+    with open(input_path, "rb") as source, open(output_path, mode) as sink:
+        sink.truncate(checkpoint["output_offset"])
+        sink.seek(checkpoint["output_offset"])
+        if total_bytes == 0 or checkpoint["input_offset"] >= total_bytes:
+            return {"lines": 0, "seconds": 0.0}
+
+        data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        start_offset = checkpoint["input_offset"]
+        slots = threading.BoundedSemaphore(processes * 4)
+        stop = threading.Event()
+        started = time.monotonic()
+        last_report = started
+        lines_done = 0
+        bytes_done = 0
+
+        pool = multiprocessing.Pool(processes, initializer=_init_bulk_worker)
+        try:
+            tasks = _bounded(_iter_chunks(data, start_offset, chunk_lines), slots, stop, fmt, language)
+            meta_queue: deque = deque()
+
+            def payloads():
+                for meta, payload in tasks:
+                    meta_queue.append(meta)
+                    yield payload
+
+            for output in pool.imap(_process_chunk, payloads()):
+                _, chunk_end, line_count = meta_queue.popleft()
+                slots.release()
+                sink.writelines(output)
+                sink.flush()
+
+                lines_done += line_count
+                bytes_done = chunk_end - start_offset
+                checkpoint = {
+                    "input_offset": chunk_end,
+                    "output_offset": sink.tell(),
+                    "lines": checkpoint["lines"] + line_count,
+                }
+                _save_checkpoint(checkpoint_path, checkpoint)
+
+                now = time.monotonic()
+                if now - last_report >= report_interval:
+                    last_report = now
+                    elapsed = now - started
+                    rate = bytes_done / elapsed if elapsed else 0.0
+                    eta = (total_bytes - chunk_end) / rate if rate else float("inf")
+                    logger.info(
+                        f"{checkpoint['lines']} lines, {chunk_end * 100 / total_bytes:.1f}% | "
+                        f"{lines_done / elapsed:.0f} segments/s, {rate / 2**20:.2f} MB/s | ETA {eta:.0f}s"
+                    )
+        finally:
+            stop.set()
+            pool.terminate()
+            pool.join()
+            data.close()
+
+    elapsed = time.monotonic() - started
+    summary = {
+        "lines": lines_done,
+        "bytes": bytes_done,
+        "seconds": round(elapsed, 2),
+        "segments_per_sec": round(lines_done / elapsed, 1) if elapsed else None,
+    }
+    logger.info(f"Bulk anonymization finished: {summary}")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.main bulk", description="Anonymize JSONL or plain-text corpora offline")
+    parser.add_argument("input", help="Input file: JSONL with text/language fields, or plain text with one segment per line")
+    parser.add_argument("output", help="Output JSONL file, one anonymized_text/mappings record per input line")
+    parser.add_argument("--format", choices=["jsonl", "text"], default=None, help="Input format (default: by file extension)")
+    parser.add_argument("--language", type=str, default="auto", help="Language for plain text, or JSONL lines without one (\"auto\" detects it)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes, each loading its own models")
+    parser.add_argument("--chunk-lines", type=int, default=256, help="Lines per task sent to a worker")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file (default: <output>.ckpt)")
+    parser.add_argument("--resume", action="store_true", help="Resume from the checkpoint instead of starting over")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between progress reports")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    fmt = args.format or ("jsonl" if args.input.endswith((".jsonl", ".ndjson")) else "text")
+    run(
+        input_path=args.input,
+        output_path=args.output,
+        fmt=fmt,
+        language=args.language,
+        processes=max(args.processes, 1),
+        chunk_lines=max(args.chunk_lines, 1),
+        checkpoint_path=args.checkpoint or f"{args.output}.ckpt",
+        resume=args.resume,
+        report_interval=args.report_interval,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,55 @@ class Settings(BaseSettings):
     nlp_conf_file: Optional[str] = Field(None, env="NLP_CONF_FILE")
     recognizer_registry_conf_file: Optional[str] = Field(None, env="RECOGNIZER_REGISTRY_CONF_FILE")
     cors_origins: List[str] = Field(["*"], env="CORS_ORIGINS")
+    nlp_batch_size: int = Field(32, env="NLP_BATCH_SIZE")
+    nlp_n_process: int = Field(1, env="NLP_N_PROCESS")
+    nlp_profile: str = Field("auto", env="NLP_PROFILE")
+    pattern_matcher: str = Field("compiled", env="PATTERN_MATCHER")
+    executor_kind: str = Field("thread", env="EXECUTOR_KIND")
+    executor_max_workers: int = Field(4, env="EXECUTOR_MAX_WORKERS")
+    executor_max_queue: int = Field(64, env="EXECUTOR_MAX_QUEUE")
+    executor_retry_after: int = Field(1, env="EXECUTOR_RETRY_AFTER")
+    executor_start_method: str = Field("fork", env="EXECUTOR_START_METHOD")
+    executor_bulk_workers: int = Field(2, env="EXECUTOR_BULK_WORKERS")
+    coalesce_enabled: bool = Field(True, env="COALESCE_ENABLED")
+    coalesce_max_batch: int = Field(32, env="COALESCE_MAX_BATCH")
+    coalesce_max_wait_ms: float = Field(5.0, env="COALESCE_MAX_WAIT_MS")
+    startup_warmup: bool = Field(True, env="STARTUP_WARMUP")
+    model_warm_languages: List[str] = Field(["*"], env="MODEL_WARM_LANGUAGES")
+    model_idle_seconds: int = Field(1800, env="MODEL_IDLE_SECONDS")
+    model_memory_budget_mb: int = Field(0, env="MODEL_MEMORY_BUDGET_MB")
+    overlap_policy: str = Field("score", env="OVERLAP_POLICY")
+    chunk_threshold: int = Field(100_000, env="CHUNK_THRESHOLD")
+    chunk_size: int = Field(50_000, env="CHUNK_SIZE")
+    chunk_overlap: int = Field(500, env="CHUNK_OVERLAP")
+    language_detection: str = Field("auto", env="LANGUAGE_DETECTION")
+    language_detection_sentences: bool = Field(True, env="LANGUAGE_DETECTION_SENTENCES")
+    incremental_context_sentences: int = Field(1, env="INCREMENTAL_CONTEXT_SENTENCES")
+    ad_hoc_cache_entries: int = Field(512, env="AD_HOC_CACHE_ENTRIES")
+    recognizer_sets_max: int = Field(1024, env="RECOGNIZER_SETS_MAX")
+    jobs_enabled: bool = Field(True, env="JOBS_ENABLED")
+    jobs_dir: str = Field("/tmp/anonymizer/jobs", env="JOBS_DIR")
+    jobs_chunk_lines: int = Field(256, env="JOBS_CHUNK_LINES")
+    jobs_max_running: int = Field(1, env="JOBS_MAX_RUNNING")
+    jobs_ttl_seconds: int = Field(24 * 3600, env="JOBS_TTL_SECONDS")
+    stream_chunk_size: int = Field(32, env="STREAM_CHUNK_SIZE")
+    stream_max_in_flight: int = Field(4, env="STREAM_MAX_IN_FLIGHT")
+    max_text_bytes: int = Field(16 * 1024 * 1024, env="MAX_TEXT_BYTES")
+    max_batch_items: int = Field(10_000, env="MAX_BATCH_ITEMS")
+    max_batch_bytes: int = Field(64 * 1024 * 1024, env="MAX_BATCH_BYTES")
+    metrics_enabled: bool = Field(True, env="METRICS_ENABLED")
+    cache_enabled: bool = Field(True, env="CACHE_ENABLED")
+    cache_max_bytes: int = Field(64 * 1024 * 1024, env="CACHE_MAX_BYTES")
+    cache_ttl_seconds: int = Field(3600, env="CACHE_TTL_SECONDS")
+    cache_backend: str = Field("memory", env="CACHE_BACKEND")
+    cache_sqlite_path: str = Field("/tmp/anonymizer/cache.sqlite3", env="CACHE_SQLITE_PATH")
+    cache_sqlite_max_bytes: int = Field(512 * 1024 * 1024, env="CACHE_SQLITE_MAX_BYTES")
+    vault_enabled: bool = Field(False, env="VAULT_ENABLED")
+    vault_max_bytes: int = Field(64 * 1024 * 1024, env="VAULT_MAX_BYTES")
+    vault_ttl_seconds: int = Field(24 * 3600, env="VAULT_TTL_SECONDS")
+    vault_backend: str = Field("memory", env="VAULT_BACKEND")
+    vault_sqlite_path: str = Field("/tmp/anonymizer/vault.sqlite3", env="VAULT_SQLITE_PATH")
+    vault_sqlite_max_bytes: int = Field(512 * 1024 * 1024, env="VAULT_SQLITE_MAX_BYTES")
     
     @field_validator('environment')
     def validate_environment(cls, v):
@@ -26,6 +75,55 @@ class Settings(BaseSettings):
         allowed = {'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'}
         return v.upper() if v.upper() in allowed else 'INFO'
 
+    @field_validator('nlp_batch_size', 'nlp_n_process', 'executor_max_workers', 'executor_retry_after',
+                     'stream_chunk_size', 'stream_max_in_flight', 'chunk_size', 'vault_ttl_seconds',
+                     'ad_hoc_cache_entries', 'recognizer_sets_max', 'executor_bulk_workers',
+                     'jobs_chunk_lines', 'jobs_max_running', 'jobs_ttl_seconds', 'coalesce_max_batch')
+    def validate_positive(cls, v):
+        return max(v, 1)
+
+    @field_validator('coalesce_max_wait_ms')
+    def validate_coalesce_max_wait_ms(cls, v):
+        return max(v, 0.0)
+
+    @field_validator('executor_max_queue', 'chunk_threshold', 'chunk_overlap', 'model_idle_seconds',
+                     'model_memory_budget_mb', 'incremental_context_sentences', 'max_text_bytes',
+                     'max_batch_items', 'max_batch_bytes')
+    def validate_non_negative(cls, v):
+        return max(v, 0)
+
+    @field_validator('nlp_profile')
+    def validate_nlp_profile(cls, v):
+        return v.lower() if v.lower() in {'full', 'auto', 'pattern'} else 'auto'
+
+    @field_validator('pattern_matcher')
+    def validate_pattern_matcher(cls, v):
+        return v.lower() if v.lower() in {'stock', 'compiled'} else 'compiled'
+
+    @field_validator('executor_kind')
+    def validate_executor_kind(cls, v):
+        return v.lower() if v.lower() in {'thread', 'process'} else 'thread'
+
+    @field_validator('executor_start_method')
+    def validate_executor_start_method(cls, v):
+        return v.lower() if v.lower() in {'fork', 'spawn', 'forkserver'} else 'fork'
+
+    @field_validator('model_warm_languages')
+    def validate_model_warm_languages(cls, v):
+        return [lang.strip().lower() for lang in v if lang.strip()]
+
+    @field_validator('overlap_policy')
+    def validate_overlap_policy(cls, v):
+        return v.lower() if v.lower() in {'score', 'length', 'priority', 'leftmost'} else 'score'
+
+    @field_validator('language_detection')
+    def validate_language_detection(cls, v):
+        return v.lower() if v.lower() in {'off', 'auto', 'always'} else 'auto'
+
+    @field_validator('cache_backend', 'vault_backend')
+    def validate_backend(cls, v):
+        return v.lower() if v.lower() in {'memory', 'sqlite'} else 'memory'
+
 @lru_cache()
 def get_settings() -> Settings:
     settings = Settings()
@@ -1,20 +1,101 @@
 from fastapi import FastAPI
+import asyncio
 import logging
-import time
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import get_settings, configure_logging
-from app.routers import analysis, health, anonymization, translation
-from app.services.analyzer import AnalyzerService
-from app.services.anonymizer import AnonymizerService
-from app.services.translation_anonymizer import TranslationAnonymizerService
+from app.routers import analysis, health, anonymization, translation, jobs, metrics as metrics_router
+from app.services import metrics, startup, workers
+from app.services.coalescer import create_request_coalescer
+from app.services.executor import AnalysisExecutor, QueueFullError
+from app.services.jobs import JobScheduler, create_job_store
+from app.services.limits import BodySizeLimitMiddleware, validation_error_handler
+from app.services.recognizer_sets import RecognizerSets
+from app.services.vault import create_mapping_vault
 
 configure_logging()
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-app = FastAPI(title=settings.app_name)
+# Served while models are still loading, so probes and scrapes keep working.
+STARTUP_PATHS = {"/health", "/health/languages", "/ready", "/metrics", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json"}
+
+async def initialize(app: FastAPI):
+    profile = app.state.startup
+    try:
+        with profile.stage("imports"):
+            await asyncio.to_thread(startup.import_heavy_modules, profile)
+
+        with profile.stage("models"):
+            services = await asyncio.to_thread(workers.load_services, settings)
+        workers.register_services(services)
+        app.state.analyzer = services["analyzer"]
+        app.state.anonymizer = services["anonymizer"]
+        app.state.translation_anonymizer = services["translation_anonymizer"]
+        # Lives in the server process so every executor worker's mappings can
+        # be restored regardless of which worker produced them.
+        app.state.vault = create_mapping_vault(settings)
+        app.state.recognizer_sets = RecognizerSets(settings.recognizer_sets_max)
+        profile.models = {
+            language: state.get("load_seconds")
+            for language, state in services["analyzer"].language_status().items()
+            if state["ready"]
+        }
+
+        if settings.startup_warmup:
+            with profile.stage("warmup"):
+                await asyncio.to_thread(startup.warm_up, services, profile)
+
+        # Built on the event loop thread: process workers are forked here,
+        # after the models are loaded and warmed up.
+        with profile.stage("executor"):
+            executor = AnalysisExecutor(
+                kind=settings.executor_kind,
+                max_workers=settings.executor_max_workers,
+                max_queue=settings.executor_max_queue,
+                retry_after=settings.executor_retry_after,
+                initializer=workers.init_worker,
+                start_method=settings.executor_start_method,
+                bulk_workers=settings.executor_bulk_workers,
+            )
+            executor.start()
+            app.state.executor = executor
+            app.state.coalescer = create_request_coalescer(settings, executor)
+
+        # Jobs left unfinished by a previous run resume once the pool is up.
+        app.state.jobs = await asyncio.to_thread(create_job_store, settings)
+        if app.state.jobs is not None:
+            app.state.job_scheduler = JobScheduler(
+                app.state.jobs, executor, settings.jobs_chunk_lines, settings.jobs_max_running
+            )
+            app.state.job_scheduler.start()
+        profile.finish()
+    except Exception as e:
+        profile.fail(e)
+        logger.exception(f"Startup failed: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.startup = startup.StartupProfile()
+    init_task = asyncio.create_task(initialize(app))
+    yield
+    init_task.cancel()
+    if getattr(app.state, "job_scheduler", None) is not None:
+        await app.state.job_scheduler.stop()
+    if hasattr(app.state, "executor"):
+        app.state.executor.shutdown()
+
+async def label_endpoint(request: Request) -> None:
+    # Runs once the route is matched, in the task that serves the request,
+    # so the pipeline metrics get the route template (e.g. /jobs/{job_id}),
+    # never the raw path.
+    metrics.endpoint_var.set(request.scope["route"].path)
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan, dependencies=[Depends(label_endpoint)])
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,37 +105,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=settings.max_batch_bytes)
+
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
+    start_time = metrics.clock()
     response = await call_next(request)
-    process_time = time.time() - start_time
+    process_time = metrics.clock() - start_time
     response.headers["X-Process-Time"] = str(process_time)
+    # Label by route template so unmatched paths can't blow up cardinality.
+    route = request.scope.get("route")
+    metrics.REQUEST_SECONDS.labels(
+        route.path if route else "unmatched", request.method, response.status_code
+    ).observe(process_time)
     return response
 
-@app.on_event("startup")
-def startup_event():
-    logger.info("Pre-loading analyzer engine...")
-    app.state.analyzer = AnalyzerService(get_settings())
-    logger.info("Analyzer engine loaded successfully")
-    
-    logger.info("Pre-loading anonymizer engine...")
-    app.state.anonymizer = AnonymizerService()
-    logger.info("Anonymizer engine loaded successfully")
-
-    logger.info("Pre-loading translation anonymizer service...")
-    app.state.translation_anonymizer = TranslationAnonymizerService(
-        analyzer_engine=app.state.analyzer.engine,
-        anonymizer_engine=app.state.anonymizer.anonymizer
+@app.middleware("http")
+async def readiness_gate(request: Request, call_next):
+    if not request.app.state.startup.ready and request.url.path not in STARTUP_PATHS:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"Service is starting ({request.app.state.startup.phase})"},
+            headers={"Retry-After": str(settings.executor_retry_after)},
+        )
+    return await call_next(request)
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
     )
-    logger.info("Translation anonymizer loaded successfully")
+
+app.add_exception_handler(RequestValidationError, validation_error_handler)
 
 app.include_router(health.router)
 app.include_router(analysis.router)
 app.include_router(anonymization.router)
 app.include_router(translation.router)
+if settings.jobs_enabled:
+    app.include_router(jobs.router)
+if settings.metrics_enabled:
+    app.include_router(metrics_router.router)
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "bulk":
+        from app.bulk import main as bulk_main
+        bulk_main(sys.argv[2:])
+        sys.exit(0)
+
     import uvicorn
     import argparse
     parser = argparse.ArgumentParser(description="Run LangOps NER API")
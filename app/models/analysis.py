@@ -1,6 +1,8 @@
 from pydantic import BaseModel, field_validator, Field
 from typing import List, Optional, Dict, Any
 
+from app.services.limits import check_text
+
 
 class AnalyzeRequest(BaseModel):
     text: str
@@ -14,7 +16,13 @@ class AnalyzeRequest(BaseModel):
     allow_list: Optional[List[str]] = None
     allow_list_match: Optional[str] = None
     regex_flags: Optional[int] = None
+    pattern_only: Optional[bool] = None
+    recognizer_set_id: Optional[str] = None
     
+    @field_validator('text')
+    def validate_text(cls, v):
+        return check_text(v)
+
     @field_validator('score_threshold')
     def validate_score_threshold(cls, v):
         if v is not None and (v < 0 or v > 1):
@@ -41,3 +49,14 @@ class EntityResult(BaseModel):
             }
         }
     }
+
+
+class RecognizerSetRequest(BaseModel):
+    ad_hoc_recognizers: List[Dict[str, Any]] = []
+    allow_list: Optional[List[str]] = None
+    allow_list_match: Optional[str] = None
+
+
+class RecognizerSetResponse(BaseModel):
+    recognizer_set_id: str
+    recognizers: int
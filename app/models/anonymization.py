@@ -1,12 +1,18 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import List, Optional, Dict, Any, Union
 
+from app.services.limits import check_text
+
 
 class AnonymizeRequest(BaseModel):
     text: str
     analyzer_results: List[Dict[str, Any]]
     anonymizers: Optional[Dict[str, Union[str, Dict[str, Any]]]] = None
 
+    @field_validator('text')
+    def validate_text(cls, v):
+        return check_text(v)
+
 
 class AnonymizeResult(BaseModel):
     text: str
@@ -24,3 +30,7 @@ class DeanonymizeRequest(BaseModel):
     text: str
     entities: List[DeanonymizeEntity]
     deanonymizers: Optional[Dict[str, Union[str, Dict[str, Any]]]] = None
+
+    @field_validator('text')
+    def validate_text(cls, v):
+        return check_text(v)
@@ -1,23 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import List
-from app.models.analysis import AnalyzeRequest, EntityResult
-from app.services.analyzer import AnalyzerService
-from app.config import get_settings
-from functools import lru_cache
+from app.models.analysis import AnalyzeRequest, EntityResult, RecognizerSetRequest, RecognizerSetResponse
+from app.services import wire, workers
+from app.services.executor import QueueFullError
 
 router = APIRouter(prefix="/system", tags=["analysis"])
 
-@lru_cache()
-def get_analyzer_service() -> AnalyzerService:
-    settings = get_settings()
-    return AnalyzerService(settings)
+
+def _with_recognizer_set(request: Request, req: AnalyzeRequest) -> AnalyzeRequest:
+    # Registered sets live in the server process; workers get the definitions
+    # and find the compiled recognizers in their own cache by content hash.
+    recognizer_set = request.app.state.recognizer_sets.get(req.recognizer_set_id)
+    if recognizer_set is None:
+        raise HTTPException(status_code=404, detail=f"Unknown recognizer_set_id '{req.recognizer_set_id}'")
+    return req.model_copy(update={
+        "ad_hoc_recognizers": recognizer_set.get("ad_hoc_recognizers", []) + (req.ad_hoc_recognizers or []),
+        "allow_list": req.allow_list if req.allow_list is not None else recognizer_set.get("allow_list"),
+        "allow_list_match": req.allow_list_match or recognizer_set.get("allow_list_match"),
+        "recognizer_set_id": None,
+    })
 
 @router.post("/analyze", response_model=List[EntityResult])
-def analyze(req: AnalyzeRequest, request: Request):
+async def analyze(req: AnalyzeRequest, request: Request, layout: wire.Layout = Query("rows")):
+    if req.recognizer_set_id:
+        req = _with_recognizer_set(request, req)
     try:
-        return request.app.state.analyzer.analyze(req)
+        entities = await request.app.state.executor.run(workers.analyze, req)
+    except QueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return wire.render(request, wire.columnar_entities(entities) if layout == "columnar" else entities)
+
+@router.post("/recognizers/sets", response_model=RecognizerSetResponse)
+async def register_recognizer_set(body: RecognizerSetRequest, request: Request):
+    # Compiled on the executor so large definitions don't block the event
+    # loop; this also warms the ad-hoc cache of the worker that runs it.
+    try:
+        await request.app.state.executor.run(
+            workers.check_recognizer_set, body.ad_hoc_recognizers, body.allow_list, body.allow_list_match
+        )
+    except QueueFullError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Invalid recognizer set: {str(e)}")
+    set_id = request.app.state.recognizer_sets.register(body.model_dump(exclude_none=True))
+    return {"recognizer_set_id": set_id, "recognizers": len(body.ad_hoc_recognizers)}
+
+@router.get("/recognizers/sets/{set_id}", response_model=RecognizerSetRequest)
+def get_recognizer_set(set_id: str, request: Request):
+    recognizer_set = request.app.state.recognizer_sets.get(set_id)
+    if recognizer_set is None:
+        raise HTTPException(status_code=404, detail=f"Unknown recognizer_set_id '{set_id}'")
+    return recognizer_set
 
 @router.get("/recognizers")
 def recognizers(request: Request, language: str = None):
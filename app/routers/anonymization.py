@@ -2,7 +2,8 @@ import logging
 from fastapi import APIRouter, Request, HTTPException, status
 
 from app.models.anonymization import AnonymizeRequest, AnonymizeResult, DeanonymizeRequest
-from app.services.anonymizer import AnonymizerService
+from app.services import workers
+from app.services.executor import QueueFullError
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +15,10 @@ router = APIRouter(prefix="/system", tags=["anonymization"])
     summary="Anonymize text containing PII"
 )
 async def anonymize(req: AnonymizeRequest, request: Request):
-    if not hasattr(request.app.state, "anonymizer"):
-        request.app.state.anonymizer = AnonymizerService()
-        
     try:
-        return request.app.state.anonymizer.anonymize(req)
+        return await request.app.state.executor.run(workers.anonymize, req)
+    except QueueFullError:
+        raise
     except ValueError as e:
         logger.warning(f"Invalid anonymization request: {str(e)}")
         raise HTTPException(
@@ -38,11 +38,10 @@ async def anonymize(req: AnonymizeRequest, request: Request):
     summary="Deanonymize previously anonymized text"
 )
 async def deanonymize(req: DeanonymizeRequest, request: Request):
-    if not hasattr(request.app.state, "anonymizer"):
-        request.app.state.anonymizer = AnonymizerService()
-        
     try:
-        return request.app.state.anonymizer.deanonymize(req)
+        return await request.app.state.executor.run(workers.deanonymize, req)
+    except QueueFullError:
+        raise
     except ValueError as e:
         logger.warning(f"Invalid deanonymization request: {str(e)}")
         raise HTTPException(
@@ -63,6 +62,7 @@ async def deanonymize(req: DeanonymizeRequest, request: Request):
 )
 async def anonymizers(request: Request):
     if not hasattr(request.app.state, "anonymizer"):
+        from app.services.anonymizer import AnonymizerService
         request.app.state.anonymizer = AnonymizerService()
         
     return request.app.state.anonymizer.get_anonymizers()
@@ -74,6 +74,7 @@ async def anonymizers(request: Request):
 )
 async def deanonymizers(request: Request):
     if not hasattr(request.app.state, "anonymizer"):
+        from app.services.anonymizer import AnonymizerService
         request.app.state.anonymizer = AnonymizerService()
         
     return request.app.state.anonymizer.get_deanonymizers()
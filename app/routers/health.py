@@ -1,15 +1,123 @@
-from fastapi import APIRouter, status
-from fastapi.responses import PlainTextResponse
+from typing import Any, Optional, Tuple
+
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+
+from app.services import workers
+from app.services.memory import process_memory
 
 router = APIRouter(
     prefix="", 
     tags=["health"]
 )
 
+def _server_language_status(request: Request) -> dict:
+    # What the server process has loaded; empty until models are loaded.
+    analyzer = getattr(request.app.state, "analyzer", None)
+    return analyzer.language_status() if analyzer is not None else {}
+
+def _server_cache_stats(request: Request) -> dict:
+    translation_anonymizer = getattr(request.app.state, "translation_anonymizer", None)
+    cache = translation_anonymizer.cache if translation_anonymizer is not None else None
+    return cache.stats() if cache else {}
+
+def _server_ad_hoc_stats(request: Request) -> dict:
+    analyzer = getattr(request.app.state, "analyzer", None)
+    return analyzer.ad_hoc_stats() if analyzer is not None else {}
+
+async def _worker_view(request: Request, fn, server_view) -> Tuple[Optional[int], Any]:
+    # Thread workers share the server process's services, so those are read
+    # in place. Process workers each hold their own lazily loaded languages
+    # and caches, and a task can't pick its worker: the answer is a sample
+    # from whichever worker runs it (X-Worker-Pid), not a pool-wide view,
+    # and is subject to the executor's queue limit (429). There are no
+    # workers during startup.
+    executor = getattr(request.app.state, "executor", None)
+    if executor is None or executor.kind != "process":
+        return None, server_view(request)
+    return await executor.run(workers.sample, fn)
+
+def _sampled(pid: Optional[int], content: Any) -> JSONResponse:
+    return JSONResponse(content=content, headers={"X-Worker-Pid": str(pid)} if pid is not None else None)
+
+@router.get(
+    "/health",
+    status_code=status.HTTP_200_OK
+)
+def health(request: Request):
+    # Liveness, with the startup phase and per-language state for a quick
+    # look: 200 while starting or ready, 503 once startup has failed, so the
+    # orchestrator restarts the process instead of waiting on /ready forever.
+    profile = request.app.state.startup
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE if profile.failed else status.HTTP_200_OK,
+        content={
+            "status": "failed" if profile.failed else "up",
+            "ready": profile.ready,
+            "phase": profile.phase,
+            "error": profile.error,
+            "languages": _server_language_status(request),
+        },
+    )
+
+@router.get(
+    "/ready",
+    status_code=status.HTTP_200_OK
+)
+def ready(request: Request):
+    profile = request.app.state.startup
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if profile.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=profile.snapshot(),
+    )
+
+@router.get(
+    "/health/memory",
+    status_code=status.HTTP_200_OK
+)
+def memory(request: Request):
+    executor = request.app.state.executor
+    return {
+        "executor": executor.kind,
+        "start_method": executor.start_method,
+        "parent": process_memory(),
+        "workers": {pid: process_memory(pid) for pid in executor.worker_pids()},
+    }
+
+@router.get(
+    "/health/languages",
+    status_code=status.HTTP_200_OK
+)
+async def languages(request: Request):
+    return _sampled(*await _worker_view(request, workers.language_status, _server_language_status))
+
+@router.get(
+    "/health/cache",
+    status_code=status.HTTP_200_OK
+)
+async def cache(request: Request):
+    return _sampled(*await _worker_view(request, workers.cache_stats, _server_cache_stats))
+
+@router.get(
+    "/health/recognizers",
+    status_code=status.HTTP_200_OK
+)
+async def recognizers(request: Request):
+    pid, ad_hoc_stats = await _worker_view(request, workers.ad_hoc_stats, _server_ad_hoc_stats)
+    return _sampled(pid, {"registered_sets": len(request.app.state.recognizer_sets), "ad_hoc_cache": ad_hoc_stats})
+
+@router.get(
+    "/health/vault",
+    status_code=status.HTTP_200_OK
+)
+def vault(request: Request):
+    vault = request.app.state.vault
+    return vault.stats() if vault else {}
+
 @router.get(
-    "/health", 
-    response_class=PlainTextResponse, 
+    "/health/coalescer",
     status_code=status.HTTP_200_OK
 )
-def health() -> str:
-    return "Presidio NER API service is up"
+def coalescer(request: Request):
+    coalescer = request.app.state.coalescer
+    return coalescer.stats() if coalescer else {}
@@ -0,0 +1,96 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.services import wire
+from app.services.limits import MAX_BATCH_BYTES
+from app.services.jobs import JobStore, progress
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Lines are handed to the store in groups while the upload streams in.
+SUBMIT_BATCH_LINES = 1024
+
+
+def _store(request: Request) -> JobStore:
+    return request.app.state.jobs
+
+
+async def _job(request: Request, job_id: str) -> dict:
+    state = await asyncio.to_thread(_store(request).get, job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return state
+
+
+@router.post(
+    "",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a batch for background anonymization"
+)
+async def submit_job(request: Request, language: str = Query("auto")):
+    # Accepts a JSON array of {"text", "language", ...} objects, or the same
+    # objects as NDJSON (application/x-ndjson), which is spooled to disk as it
+    # arrives. `language` applies to items without one.
+    store = _store(request)
+    state = await asyncio.to_thread(store.create, language)
+    try:
+        if request.headers.get("content-type", "").startswith(("application/x-ndjson", "application/jsonl")):
+            lines = []
+            async for line in wire.iter_lines(request, MAX_BATCH_BYTES):
+                lines.append(line)
+                if len(lines) >= SUBMIT_BATCH_LINES:
+                    await asyncio.to_thread(store.write_input, state, lines)
+                    lines = []
+            await asyncio.to_thread(store.write_input, state, lines)
+        else:
+            items = json.loads(await request.body())
+            if not isinstance(items, list):
+                raise ValueError("Expected a JSON array of segments")
+            lines = [json.dumps(item, ensure_ascii=False).encode("utf-8") for item in items]
+            await asyncio.to_thread(store.write_input, state, lines)
+    except ValueError as e:
+        await asyncio.to_thread(store.delete, state["id"])
+        raise HTTPException(status_code=422, detail=str(e))
+    except BaseException:
+        store.delete(state["id"])
+        raise
+
+    await asyncio.to_thread(store.seal, state)
+    request.app.state.job_scheduler.notify()
+    return progress(state)
+
+@router.get("", summary="List jobs")
+async def list_jobs(request: Request):
+    return [progress(state) for state in await asyncio.to_thread(_store(request).list)]
+
+@router.get("/{job_id}", summary="Job status and progress")
+async def get_job(job_id: str, request: Request):
+    return progress(await _job(request, job_id))
+
+@router.get("/{job_id}/results", summary="Stream processed results as NDJSON")
+async def get_job_results(
+    job_id: str,
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    # Result line i belongs to submitted item i. While the job runs this
+    # returns the lines finished so far; page with offset/limit.
+    state = await _job(request, job_id)
+    if state["status"] == "failed" and not state["done"]:
+        raise HTTPException(status_code=409, detail=f"Job failed: {state['error']}")
+    return StreamingResponse(
+        _store(request).read_results(state, offset, limit or state["total"]),
+        media_type="application/x-ndjson",
+        headers={"X-Job-Status": state["status"], "X-Job-Done": str(state["done"]), "X-Job-Total": str(state["total"])},
+    )
+
+@router.delete("/{job_id}", summary="Cancel a job and delete its data")
+async def cancel_job(job_id: str, request: Request):
+    if not await asyncio.to_thread(_store(request).cancel, job_id):
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return {"id": job_id, "status": "cancelled"}
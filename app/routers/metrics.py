@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response, status
+
+from app.services import metrics
+
+router = APIRouter(
+    prefix="",
+    tags=["metrics"]
+)
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK
+)
+def prometheus_metrics() -> Response:
+    payload, content_type = metrics.render()
+    return Response(content=payload, media_type=content_type)
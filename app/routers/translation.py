@@ -1,16 +1,46 @@
-from typing import List
+import asyncio
+import logging
+from typing import Annotated, AsyncIterator, List, Optional, Set, Tuple
 
-from fastapi import APIRouter, Request
-from pydantic import BaseModel
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ValidationError, field_validator
 
-from app.services.translation_anonymizer import TranslationAnonymizerService
+from app.config import get_settings
+from app.services import wire, workers
+from app.services.executor import QueueFullError
+from app.services.limits import MAX_BATCH_BYTES, MAX_BATCH_ITEMS, check_text
+from app.services.vault import restore_text
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["translation"])
 
 
 class TranslationAnonymizeRequest(BaseModel):
     text: str
-    language: str
+    # "auto" (or omitted) detects the language per segment, and per sentence
+    # when a segment mixes languages; see LANGUAGE_DETECTION.
+    language: str = "auto"
+    entities: Optional[List[str]] = None
+    pattern_only: Optional[bool] = None
+    # With the mapping vault enabled, False leaves the originals on the server
+    # and the response carries only the mapping_id.
+    include_mappings: bool = True
+    # Incremental re-analysis of an edited segment: pass the mapping_id of the
+    # previous version to re-analyze only the sentences around the edits and
+    # keep its placeholder numbering. keep_revision stores this version for
+    # the next edit (implied by previous_mapping_id). Needs the mapping vault.
+    previous_mapping_id: Optional[str] = None
+    keep_revision: bool = False
+
+    @field_validator('text')
+    def validate_text(cls, v):
+        return check_text(v)
+
+    @property
+    def tracks_revisions(self) -> bool:
+        return bool(self.previous_mapping_id) or self.keep_revision
 
 class Mapping(BaseModel):
     placeholder: str
@@ -18,21 +48,99 @@ class Mapping(BaseModel):
     end: int
     entity_type: str
     original: str
+    placeholder_start: int
+    placeholder_end: int
 
 class AnonymizationResponse(BaseModel):
     anonymized_text: str
     mappings: List[Mapping]
+    mapping_id: Optional[str] = None
 
+class RestoreRequest(BaseModel):
+    text: str
+    mapping_id: str
+    discard: bool = False
 
-@router.post("/anonymize", response_model=AnonymizationResponse)
-async def anonymize_for_translation(req: TranslationAnonymizeRequest, request: Request):
-    if not hasattr(request.app.state, "translation_anonymizer"):
-        request.app.state.translation_anonymizer = TranslationAnonymizerService()
-    service = request.app.state.translation_anonymizer
-    anonymized_text, mappings = service.analyze_and_anonymize(
-        req.text, req.language
+    @field_validator('text')
+    def validate_text(cls, v):
+        return check_text(v)
+
+class RestoreResponse(BaseModel):
+    text: str
+    restored: int
+    missing: List[str]
+
+
+async def _anonymization_results(
+    request: Request, reqs: List[TranslationAnonymizeRequest], outputs: List[Tuple[str, list]]
+) -> List[dict]:
+    results = [{"anonymized_text": anonymized_text, "mappings": mappings} for anonymized_text, mappings in outputs]
+    vault = request.app.state.vault
+    if vault is None or not results:
+        return results
+    # Off the event loop: with VAULT_BACKEND=sqlite this is disk I/O, one
+    # transaction per call.
+    mapping_ids = await asyncio.to_thread(vault.put_many, [mappings for _, mappings in outputs])
+    for req, result, mapping_id in zip(reqs, results, mapping_ids):
+        result["mapping_id"] = mapping_id
+        if not req.include_mappings:
+            result["mappings"] = []
+    return results
+
+
+async def _anonymize_revision(request: Request, req: TranslationAnonymizeRequest) -> Tuple[dict, float]:
+    vault = request.app.state.vault
+    if vault is None:
+        raise HTTPException(status_code=404, detail="Mapping vault is disabled")
+    previous = None
+    if req.previous_mapping_id:
+        previous = await asyncio.to_thread(vault.get_revision, req.previous_mapping_id)
+        if previous is None:
+            raise HTTPException(
+                status_code=404, detail=f"Unknown or expired revision for mapping_id '{req.previous_mapping_id}'"
+            )
+    anonymized_text, mappings, revision, reanalyzed_ratio = await request.app.state.executor.run(
+        workers.translation_anonymize_revision, req.text, req.language, req.entities, req.pattern_only, previous
     )
-    return {"anonymized_text": anonymized_text, "mappings": mappings}
+    result = (await _anonymization_results(request, [req], [(anonymized_text, mappings)]))[0]
+    await asyncio.to_thread(vault.put_revision, result["mapping_id"], revision)
+    return result, reanalyzed_ratio
+
+
+def _restore_all(vault, reqs: List[RestoreRequest]) -> List[dict]:
+    # Nothing is discarded unless every mapping_id is found.
+    results = []
+    for req in reqs:
+        originals = vault.get(req.mapping_id)
+        if originals is None:
+            raise HTTPException(status_code=404, detail=f"Unknown or expired mapping_id '{req.mapping_id}'")
+        text, restored, missing = restore_text(req.text, originals)
+        results.append({"text": text, "restored": restored, "missing": missing})
+    vault.delete_many([req.mapping_id for req in reqs if req.discard])
+    return results
+
+
+async def _restore(request: Request, reqs: List[RestoreRequest]) -> List[dict]:
+    vault = request.app.state.vault
+    if vault is None:
+        raise HTTPException(status_code=404, detail="Mapping vault is disabled")
+    return await asyncio.to_thread(_restore_all, vault, reqs)
+
+
+@router.post("/anonymize", response_model=AnonymizationResponse)
+async def anonymize_for_translation(req: TranslationAnonymizeRequest, request: Request, response: Response):
+    if req.tracks_revisions:
+        result, reanalyzed_ratio = await _anonymize_revision(request, req)
+        response.headers["X-Reanalyzed-Ratio"] = f"{reanalyzed_ratio:.3f}"
+        return result
+    coalescer = request.app.state.coalescer
+    if coalescer is not None:
+        anonymized_text, mappings = await coalescer.anonymize(req.text, req.language, req.entities, req.pattern_only)
+    else:
+        anonymized_text, mappings = await request.app.state.executor.run(
+            workers.translation_anonymize, req.text, req.language, req.entities, req.pattern_only
+        )
+    return (await _anonymization_results(request, [req], [(anonymized_text, mappings)]))[0]
 
 @router.post(
     "/anonymize/batch",
@@ -40,17 +148,139 @@ async def anonymize_for_translation(req: TranslationAnonymizeRequest, request: R
     summary="Batch anonymize for translation"
 )
 async def batch_anonymize_for_translation(
-    reqs: List[TranslationAnonymizeRequest],
-    request: Request
+    reqs: Annotated[List[TranslationAnonymizeRequest], Body(max_length=MAX_BATCH_ITEMS)],
+    request: Request,
+    layout: wire.Layout = Query("rows"),
 ):
-    if not hasattr(request.app.state, "translation_anonymizer"):
-        request.app.state.translation_anonymizer = TranslationAnonymizerService()
-    service = request.app.state.translation_anonymizer
+    unique = len({(req.text, req.language, tuple(req.entities or ()), req.pattern_only) for req in reqs})
+    headers = {
+        "X-Batch-Unique-Segments": str(unique),
+        "X-Batch-Dedup-Ratio": f"{1 - unique / len(reqs):.3f}" if reqs else "0.000",
+    }
+    # Revision-tracking items each need their own previous revision, so they
+    # run one by one next to the batch of plain items.
+    plain = [idx for idx, req in enumerate(reqs) if not req.tracks_revisions]
+    tracked = [idx for idx, req in enumerate(reqs) if req.tracks_revisions]
+    batch_results, tracked_results = await asyncio.gather(
+        request.app.state.executor.run(
+            workers.translation_anonymize_batch,
+            [(reqs[idx].text, reqs[idx].language, reqs[idx].entities, reqs[idx].pattern_only) for idx in plain],
+        ),
+        asyncio.gather(*(_anonymize_revision(request, reqs[idx]) for idx in tracked)),
+    )
+    results = [None] * len(reqs)
+    plain_results = await _anonymization_results(request, [reqs[idx] for idx in plain], batch_results)
+    for idx, result in zip(plain, plain_results):
+        results[idx] = result
+    for idx, (result, _) in zip(tracked, tracked_results):
+        results[idx] = result
+    return wire.render(request, wire.columnar_translation(results) if layout == "columnar" else results, headers)
 
-    results: List[AnonymizationResponse] = []
-    for req in reqs:
-        anonymized_text, mappings = service.analyze_and_anonymize(
-            req.text, req.language
-        )
-        results.append({"anonymized_text": anonymized_text, "mappings": mappings})
-    return results
+
+@router.post("/restore", response_model=RestoreResponse, summary="Restore placeholders from the mapping vault")
+async def restore_translation(req: RestoreRequest, request: Request):
+    return (await _restore(request, [req]))[0]
+
+@router.post(
+    "/restore/batch",
+    response_model=List[RestoreResponse],
+    summary="Batch restore placeholders from the mapping vault"
+)
+async def batch_restore_translation(
+    reqs: Annotated[List[RestoreRequest], Body(max_length=MAX_BATCH_ITEMS)], request: Request
+):
+    return await _restore(request, reqs)
+
+
+def _ndjson(obj) -> bytes:
+    return wire.dump_json(obj) + b"\n"
+
+
+async def _process_chunk(request: Request, chunk: List[Tuple[int, TranslationAnonymizeRequest]]) -> List[bytes]:
+    executor = request.app.state.executor
+    try:
+        while True:
+            try:
+                results = await executor.run(
+                    workers.translation_anonymize_batch,
+                    [(req.text, req.language, req.entities, req.pattern_only) for _, req in chunk],
+                )
+                break
+            except QueueFullError as e:
+                await asyncio.sleep(e.retry_after)
+    except Exception as e:
+        logger.error(f"Streaming batch chunk failed: {str(e)}")
+        return [_ndjson({"index": idx, "error": str(e)}) for idx, _ in chunk]
+
+    stored = await _anonymization_results(request, [req for _, req in chunk], results)
+    return [_ndjson({"index": idx, **result}) for (idx, _), result in zip(chunk, stored)]
+
+
+async def _stream_batch(request: Request, chunk_size: int, max_in_flight: int) -> AsyncIterator[bytes]:
+    pending: Set[asyncio.Task] = set()
+    chunk: List[Tuple[int, TranslationAnonymizeRequest]] = []
+
+    async def drain(limit: int) -> AsyncIterator[bytes]:
+        nonlocal pending
+        while len(pending) > limit:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for line in task.result():
+                    yield line
+
+    try:
+        index = -1
+        failure = None
+        try:
+            async for raw in wire.iter_lines(request, MAX_BATCH_BYTES):
+                index += 1
+                if not raw.strip():
+                    continue
+                try:
+                    chunk.append((index, TranslationAnonymizeRequest.model_validate_json(raw)))
+                except ValidationError as e:
+                    yield _ndjson({"index": index, "error": str(e)})
+                    continue
+
+                if len(chunk) >= chunk_size:
+                    pending.add(asyncio.create_task(_process_chunk(request, chunk)))
+                    chunk = []
+                    async for line in drain(max_in_flight - 1):
+                        yield line
+        except HTTPException as e:
+            # An over-long line: the rest of the body can't be read safely, so
+            # finish what was parsed and end with an error for that line.
+            failure = _ndjson({"index": index + 1, "error": e.detail})
+
+        if chunk:
+            pending.add(asyncio.create_task(_process_chunk(request, chunk)))
+        async for line in drain(0):
+            yield line
+        if failure is not None:
+            yield failure
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class _RequestStreamingResponse(StreamingResponse):
+    # For bodies generated while the request body is still being read. Below
+    # ASGI 2.4 StreamingResponse listens for disconnects on the same receive
+    # channel and would swallow the request body; a disconnect surfaces
+    # through request.stream() instead.
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.post(
+    "/anonymize/batch/stream",
+    summary="Stream batch anonymization for translation as NDJSON"
+)
+async def stream_batch_anonymize_for_translation(request: Request):
+    settings = get_settings()
+    return _RequestStreamingResponse(
+        _stream_batch(request, settings.stream_chunk_size, settings.stream_max_in_flight),
+        media_type="application/x-ndjson",
+    )
@@ -0,0 +1,118 @@
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from app.services.recognizer_sets import content_hash
+
+if TYPE_CHECKING:
+    from presidio_analyzer import PatternRecognizer, RecognizerResult
+
+logger = logging.getLogger(__name__)
+
+# Presidio's default flags; the `regex` module uses the same values. presidio
+# and `regex` are imported where they're used, since the server process
+# validates recognizer sets with this module and otherwise never loads them.
+DEFAULT_REGEX_FLAGS = re.DOTALL | re.MULTILINE | re.IGNORECASE
+
+
+def build_recognizer(definition: Dict[str, Any]) -> "PatternRecognizer":
+    import regex
+    from presidio_analyzer import PatternRecognizer
+
+    recognizer = PatternRecognizer.from_dict(definition)
+    # Compiled once here rather than lazily inside analyze(), where concurrent
+    # first calls would race on the Pattern attributes.
+    for pattern in recognizer.patterns:
+        pattern.compiled_regex = regex.compile(pattern.regex, flags=recognizer.global_regex_flags)
+        pattern.compiled_with_flags = recognizer.global_regex_flags
+    return recognizer
+
+
+# Same semantics as AnalyzerEngine._remove_allow_list, but the terms are
+# normalized once: a frozenset for exact matching, one compiled alternation
+# for regex matching.
+class AllowList:
+    def __init__(self, terms: Sequence[str], match: str = "exact", regex_flags: Optional[int] = None):
+        self.match = match
+        if match == "exact":
+            self._terms = frozenset(terms)
+        elif match == "regex":
+            import regex
+            from presidio_analyzer.pattern_recognizer import REGEX_TIMEOUT_SECONDS
+
+            self._timeout = REGEX_TIMEOUT_SECONDS
+            terms = [term for term in terms if term]
+            self._pattern = regex.compile("|".join(terms), flags=regex_flags) if terms else None
+        else:
+            raise ValueError("allow_list_match must either be set to 'exact' or 'regex'.")
+
+    def filter(self, results: List["RecognizerResult"], text: str) -> List["RecognizerResult"]:
+        if self.match == "exact":
+            return [result for result in results if text[result.start:result.end] not in self._terms]
+        if self._pattern is None:
+            return list(results)
+
+        kept = []
+        for result in results:
+            word = text[result.start:result.end]
+            try:
+                if not self._pattern.search(word, timeout=self._timeout):
+                    kept.append(result)
+            except TimeoutError:
+                logger.warning(f"Allow list regex timed out (word length: {len(word)}), keeping result")
+                kept.append(result)
+        return kept
+
+
+# Bounded LRU of compiled ad-hoc recognizers and normalized allow-lists, keyed
+# by a hash of their definition so clients resending the same definitions
+# reuse the compiled objects.
+class AdHocCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def recognizers(self, definitions: Sequence[Dict[str, Any]]) -> List["PatternRecognizer"]:
+        return [
+            self._get(f"recognizer:{content_hash(definition)}", lambda d=definition: build_recognizer(d))
+            for definition in definitions
+        ]
+
+    def allow_list(self, terms: Sequence[str], match: str = "exact", regex_flags: Optional[int] = None) -> AllowList:
+        if regex_flags is None:
+            regex_flags = DEFAULT_REGEX_FLAGS
+        key = f"allow_list:{content_hash([list(terms), match, regex_flags if match == 'regex' else None])}"
+        return self._get(key, lambda: AllowList(terms, match, regex_flags))
+
+    def _get(self, key: str, build) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
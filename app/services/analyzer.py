@@ -1,15 +1,37 @@
 import logging
-from typing import List, Optional, Any
+from typing import Any, Dict, List, Optional
 
-from presidio_analyzer import AnalyzerEngineProvider, AnalyzerRequest
+from presidio_analyzer import AnalyzerRequest
 from app.config import get_settings
-from app.models.analysis import AnalyzeRequest, EntityResult
+from app.models.analysis import AnalyzeRequest
+from app.services import metrics
+from app.services.ad_hoc import AdHocCache
+from app.services.chunking import analyze_chunked
+from app.services.language_models import LazyAnalyzerEngineProvider, language_status
+from app.services.nlp_profiles import tokenize_only, use_pattern_only
+from app.services.overlaps import load_entity_priority
+from app.services.pattern_matcher import install_compiled_matcher
 
 from presidio_analyzer.nlp_engine import NlpEngineProvider
 from presidio_analyzer.predefined_recognizers import TransformersRecognizer
 
 logger = logging.getLogger(__name__)
 
+
+def entity_row(result) -> Dict[str, Any]:
+    # The EntityResult shape as a plain dict, built straight from the
+    # RecognizerResult instead of through to_dict() and a model instance.
+    explanation = result.analysis_explanation
+    metadata = result.recognition_metadata or {}
+    return {
+        "entity_type": result.entity_type,
+        "start": result.start,
+        "end": result.end,
+        "score": result.score,
+        "recognizer_name": metadata.get("recognizer_name"),
+        "analysis_explanation": [explanation.to_dict()] if explanation is not None else None,
+    }
+
 class AnalyzerService:
     def __init__(self, settings=None):
         settings = settings or get_settings()
@@ -20,38 +42,84 @@ class AnalyzerService:
         logger.info(f"Using Analyzer Engine config: {analyzer_config_path}")
         logger.info(f"Using NLP Engine config: {nlp_config_path}")
 
-        provider = AnalyzerEngineProvider(
+        provider = LazyAnalyzerEngineProvider(
             analyzer_engine_conf_file=analyzer_config_path,
             nlp_engine_conf_file=nlp_config_path,
+            warm_languages=settings.model_warm_languages,
+            idle_seconds=settings.model_idle_seconds,
+            memory_budget_bytes=settings.model_memory_budget_mb * 1024 * 1024,
         )
         
         self.engine = provider.create_engine()
-        
+        self.entity_priority = load_entity_priority(analyzer_config_path)
+        self.nlp_profile = settings.nlp_profile
+        self.nlp_batch_size = settings.nlp_batch_size
+        self.nlp_n_process = settings.nlp_n_process
+        self.chunk_threshold = settings.chunk_threshold
+        self.chunk_size = settings.chunk_size
+        self.chunk_overlap = settings.chunk_overlap
+        self.ad_hoc_cache = AdHocCache(settings.ad_hoc_cache_entries)
+        if settings.pattern_matcher == "compiled":
+            install_compiled_matcher(self.engine)
+        if settings.metrics_enabled:
+            metrics.install_metrics(self.engine)
 
-    def analyze(self, req_model: AnalyzeRequest) -> List[EntityResult]:
+    def analyze(self, req_model: AnalyzeRequest) -> List[Dict[str, Any]]:
         if not req_model.text or not req_model.language:
             return []
             
         try:
-            req = AnalyzerRequest(req_model.model_dump(exclude_none=True))
-            results = self.engine.analyze(
-                text=req.text,
-                language=req.language,
+            # Ad-hoc recognizers and the allow-list come from the cache instead
+            # of being rebuilt and recompiled by AnalyzerRequest on every call.
+            req = AnalyzerRequest(req_model.model_dump(exclude_none=True, exclude={"ad_hoc_recognizers", "allow_list"}))
+            ad_hoc_recognizers = (
+                self.ad_hoc_cache.recognizers(req_model.ad_hoc_recognizers) if req_model.ad_hoc_recognizers else None
+            )
+            allow_list = (
+                self.ad_hoc_cache.allow_list(req_model.allow_list, req.allow_list_match, req_model.regex_flags)
+                if req_model.allow_list else None
+            )
+            metrics.observe_text(req.language, len(req.text))
+            pattern_only = use_pattern_only(
+                self.engine, req.language, req.entities, req_model.pattern_only, self.nlp_profile
+            )
+            analyze_kwargs = dict(
                 correlation_id=req.correlation_id,
                 score_threshold=req.score_threshold,
                 entities=req.entities,
                 return_decision_process=req.return_decision_process,
-                ad_hoc_recognizers=req.ad_hoc_recognizers,
+                ad_hoc_recognizers=ad_hoc_recognizers,
                 context=req.context,
-                allow_list=req.allow_list,
-                allow_list_match=req.allow_list_match,
                 regex_flags=req.regex_flags,
             )
-            return [EntityResult(**r.to_dict()) for r in results]
+            if self.chunk_threshold and len(req.text) > self.chunk_threshold:
+                results = analyze_chunked(
+                    self.engine, req.text, req.language,
+                    self.chunk_size, self.chunk_overlap,
+                    batch_size=self.nlp_batch_size,
+                    n_process=self.nlp_n_process,
+                    pattern_only=pattern_only,
+                    **analyze_kwargs,
+                )
+            else:
+                nlp_artifacts = tokenize_only(self.engine, req.text, req.language) if pattern_only else None
+                results = self.engine.analyze(
+                    text=req.text, language=req.language, nlp_artifacts=nlp_artifacts, **analyze_kwargs
+                )
+            if allow_list is not None:
+                results = allow_list.filter(results, req.text)
+            metrics.observe_entities(req.language, len(results))
+            return [entity_row(r) for r in results]
         except Exception as e:
             logger.error(f"Analysis failed: {str(e)}")
             raise RuntimeError(f"Failed to analyze text: {str(e)}") from e
             
+    def ad_hoc_stats(self) -> Dict[str, Any]:
+        return self.ad_hoc_cache.stats()
+
+    def language_status(self) -> Dict[str, Any]:
+        return language_status(self.engine)
+
     def get_recognizers(self, language: Optional[str] = None) -> List[Any]:
         return self.engine.get_recognizers(language=language)
             
@@ -6,6 +6,7 @@ from presidio_anonymizer.entities import InvalidParamError
 from presidio_anonymizer.services.app_entities_convertor import AppEntitiesConvertor
 
 from app.models.anonymization import AnonymizeRequest, AnonymizeResult, DeanonymizeRequest, DeanonymizeEntity
+from app.services import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +31,13 @@ class AnonymizerService:
                 if AppEntitiesConvertor.check_custom_operator(anonymizers_config):
                     raise ValueError("Custom type anonymizer is not supported")
             
+            start = metrics.clock()
             result = self.anonymizer.anonymize(
                 text=request.text,
                 analyzer_results=analyzer_results,
                 operators=anonymizers_config
             )
+            metrics.observe_stage("none", "anonymize", metrics.clock() - start)
             
             return {
                 "text": result.text,
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = Path(__file__).parent.parent.parent / "config"
+
+
+def config_fingerprint(config_dir: Path) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(config_dir.glob("*")):
+        if path.suffix in {".yaml", ".yml", ".json"}:
+            digest.update(path.name.encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _config_mtimes(config_dir: Path) -> Tuple[Tuple[str, float], ...]:
+    return tuple(
+        (path.name, path.stat().st_mtime)
+        for path in sorted(config_dir.glob("*"))
+        if path.suffix in {".yaml", ".yml", ".json"}
+    )
+
+
+class SqliteCacheBackend:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._pid = None
+        self._connect()
+
+    def _connect(self) -> None:
+        # SQLite handles must not cross a fork, so each worker process opens its own.
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._writes = 0
+        # Rows hold mappings with the original PII in plaintext, so the file is
+        # owner-only; SQLite gives its -wal/-shm files the same mode.
+        os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+        if os.stat(self.path).st_mode & 0o077:
+            os.chmod(self.path, 0o600)
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT, value TEXT, size INTEGER, "
+            "expires_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+
+    def _ensure_connection(self) -> None:
+        if self._pid != os.getpid():
+            self._connect()
+
+    def get(self, key: str) -> Optional[str]:
+        self._ensure_connection()
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, fingerprint: str, value: str, ttl_seconds: float) -> None:
+        self._ensure_connection()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (key, fingerprint, value, len(value), now + ttl_seconds, now),
+            )
+            self._writes += 1
+            if self._writes % 256 == 0:
+                self._trim(now)
+
+    def set_many(self, items: List[Tuple[str, str]], fingerprint: str, ttl_seconds: float) -> None:
+        # One transaction for the lot: autocommit would sync once per row.
+        if not items:
+            return
+        self._ensure_connection()
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                    [(key, fingerprint, value, len(value), now + ttl_seconds, now) for key, value in items],
+                )
+                if self._writes // 256 != (self._writes + len(items)) // 256:
+                    self._trim(now)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self._writes += len(items)
+
+    def _trim(self, now: float) -> int:
+        self._conn.execute("DELETE FROM results WHERE expires_at < ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM results ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        return evicted
+
+    def delete(self, key: str) -> None:
+        self._ensure_connection()
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def delete_many(self, keys: List[str]) -> None:
+        if not keys:
+            return
+        self._ensure_connection()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("DELETE FROM results WHERE key = ?", [(key,) for key in keys])
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def purge(self, fingerprint: str) -> None:
+        self._ensure_connection()
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE fingerprint != ?", (fingerprint,))
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        config_dir: Path = CONFIG_DIR,
+        backend: Optional[SqliteCacheBackend] = None,
+        check_interval: float = 5.0,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.config_dir = config_dir
+        self.backend = backend
+        self.check_interval = check_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._mtimes = _config_mtimes(config_dir)
+        self._checked_at = time.monotonic()
+        self.fingerprint = config_fingerprint(config_dir)
+        if self.backend:
+            self.backend.purge(self.fingerprint)
+
+    def key(self, text: str, language: str, *parts: Any) -> str:
+        self._check_config()
+        digest = hashlib.sha256()
+        for part in (self.fingerprint, language, *parts):
+            digest.update(repr(part).encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < now:
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.observe_cache(True)
+                return json.loads(entry[1])
+
+        value = self.backend.get(key) if self.backend else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                metrics.observe_cache(False)
+                return None
+            self.hits += 1
+            self._store(key, value, now)
+        metrics.observe_cache(True)
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._store(key, payload, time.monotonic())
+        if self.backend:
+            self.backend.set(key, self.fingerprint, payload, self.ttl_seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "fingerprint": self.fingerprint,
+            "backend": self.backend.path if self.backend else None,
+        }
+
+    def _store(self, key: str, payload: str, now: float) -> None:
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (now + self.ttl_seconds, payload)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, payload = self._entries.pop(key)
+        self.size_bytes -= len(payload)
+
+    def _check_config(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        mtimes = _config_mtimes(self.config_dir)
+        if mtimes == self._mtimes:
+            return
+        self._mtimes = mtimes
+        fingerprint = config_fingerprint(self.config_dir)
+        if fingerprint == self.fingerprint:
+            return
+
+        logger.info(f"Configuration under {self.config_dir} changed, invalidating result cache")
+        self.fingerprint = fingerprint
+        self.clear()
+        if self.backend:
+            self.backend.purge(fingerprint)
+
+
+def create_result_cache(settings) -> Optional[ResultCache]:
+    if not settings.cache_enabled:
+        return None
+
+    backend = None
+    if settings.cache_backend == "sqlite":
+        os.makedirs(os.path.dirname(settings.cache_sqlite_path) or ".", exist_ok=True)
+        backend = SqliteCacheBackend(settings.cache_sqlite_path, settings.cache_sqlite_max_bytes)
+    return ResultCache(
+        max_bytes=settings.cache_max_bytes,
+        ttl_seconds=settings.cache_ttl_seconds,
+        backend=backend,
+    )
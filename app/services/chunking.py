@@ -0,0 +1,88 @@
+import re
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from presidio_analyzer import AnalyzerEngine, RecognizerResult
+
+from app.services.nlp_profiles import tokenize_only
+
+# Preferred cut points, strongest first: paragraph break, sentence end,
+# line break, any whitespace.
+_BOUNDARIES = [
+    re.compile(r"\n\s*\n"),
+    re.compile(r"(?<=[.!?。！？])\s+"),
+    re.compile(r"\n"),
+    re.compile(r"\s"),
+]
+
+
+class Chunk(NamedTuple):
+    start: int
+    end: int
+    own_start: int
+    own_end: int
+
+
+def _cut(text: str, start: int, limit: int) -> int:
+    floor = start + (limit - start) // 2
+    for boundary in _BOUNDARIES:
+        last = None
+        for match in boundary.finditer(text, floor, limit):
+            last = match
+        if last is not None:
+            return last.end()
+    return limit
+
+
+def split_chunks(text: str, chunk_size: int, overlap: int) -> List[Chunk]:
+    # Each chunk owns [own_start, own_end); the owned ranges partition the
+    # text and every analysis window extends them by `overlap` on both sides.
+    chunks: List[Chunk] = []
+    length = len(text)
+    start = 0
+    while start < length:
+        end = length if start + chunk_size >= length else _cut(text, start, start + chunk_size)
+        chunks.append(Chunk(max(start - overlap, 0), min(end + overlap, length), start, end))
+        start = end
+    return chunks
+
+
+def analyze_chunked(
+    engine: AnalyzerEngine,
+    text: str,
+    language: str,
+    chunk_size: int,
+    overlap: int,
+    batch_size: int = 1,
+    n_process: int = 1,
+    pattern_only: bool = False,
+    **analyze_kwargs,
+) -> List[RecognizerResult]:
+    chunks = split_chunks(text, chunk_size, overlap)
+    windows = (text[chunk.start:chunk.end] for chunk in chunks)
+    if pattern_only:
+        artifacts: Iterator[Tuple[str, object]] = (
+            (window, tokenize_only(engine, window, language)) for window in windows
+        )
+    else:
+        artifacts = engine.nlp_engine.process_batch(
+            windows, language, batch_size=batch_size, n_process=n_process
+        )
+
+    best: Dict[Tuple[int, int, str], RecognizerResult] = {}
+    for chunk, (window, nlp_artifacts) in zip(chunks, artifacts):
+        results = engine.analyze(
+            text=window, language=language, nlp_artifacts=nlp_artifacts, **analyze_kwargs
+        )
+        for res in results:
+            start = res.start + chunk.start
+            # Spans belong to the chunk whose owned range they start in; the
+            # neighbour sees the same span whole thanks to the overlap.
+            if not chunk.own_start <= start < chunk.own_end:
+                continue
+            res.start = start
+            res.end += chunk.start
+            key = (res.start, res.end, res.entity_type)
+            if key not in best or best[key].score < res.score:
+                best[key] = res
+
+    return sorted(best.values(), key=lambda r: (r.start, r.end))
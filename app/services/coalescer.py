@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services import workers
+from app.services.executor import AnalysisExecutor, QueueFullError
+
+logger = logging.getLogger(__name__)
+
+
+# Coalesces concurrent single-segment requests into analyze_and_anonymize_batch
+# calls, one queue per requested language. The window adapts to load: while
+# the executor has an idle worker a request is dispatched right away (alone,
+# when traffic is light), otherwise it waits for the next worker to free up,
+# for `max_batch` requests to gather, or at most `max_wait_ms`.
+class RequestCoalescer:
+    def __init__(self, executor: AnalysisExecutor, max_batch: int = 32, max_wait_ms: float = 5.0):
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.requests = 0
+        self._queues: Dict[Optional[str], List[Tuple[Tuple, asyncio.Future]]] = {}
+        self._timers: Dict[Optional[str], asyncio.TimerHandle] = {}
+        # Batches handed out but not finished; unlike executor.pending this
+        # counts tasks that haven't reached the pool yet.
+        self._in_flight = 0
+        self._waiting = 0
+        self._tasks = set()
+
+    async def anonymize(
+        self,
+        text: str,
+        language: Optional[str],
+        entities: Optional[List[str]] = None,
+        pattern_only: Optional[bool] = None,
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        # Same backpressure as the executor queue, counted in requests.
+        if self._waiting >= (self.executor.max_workers + self.executor.max_queue) * self.max_batch:
+            raise QueueFullError(self.executor.retry_after)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._queues.setdefault(language, [])
+        queue.append(((text, language, entities, pattern_only), future))
+        if len(queue) >= self.max_batch or self._idle():
+            self._flush(language)
+        elif language not in self._timers:
+            self._timers[language] = loop.call_later(self.max_wait, self._flush, language)
+        self._waiting += 1
+        try:
+            return await future
+        finally:
+            self._waiting -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    def _idle(self) -> bool:
+        return max(self.executor.pending, self._in_flight) < self.executor.max_workers
+
+    def _flush(self, language: Optional[str]) -> None:
+        timer = self._timers.pop(language, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self._queues.pop(language, None)
+        if not queue:
+            return
+        for start in range(0, len(queue), self.max_batch):
+            batch = queue[start:start + self.max_batch]
+            self.batches += 1
+            self.requests += len(batch)
+            self._in_flight += 1
+            task = asyncio.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _flush_oldest(self) -> None:
+        # Called when a batch finishes and its worker frees up: the queue
+        # that has waited longest goes next.
+        if self._queues and self._idle():
+            self._flush(next(iter(self._queues)))
+
+    async def _dispatch(self, batch: List[Tuple[Tuple, asyncio.Future]]) -> None:
+        try:
+            await self._run(batch)
+        finally:
+            self._in_flight -= 1
+            self._flush_oldest()
+
+    async def _run(self, batch: List[Tuple[Tuple, asyncio.Future]]) -> None:
+        try:
+            try:
+                results = await self.executor.run(workers.translation_anonymize_batch, [item for item, _ in batch])
+            except QueueFullError:
+                raise
+            except Exception as e:
+                if len(batch) == 1:
+                    raise
+                # Don't let one bad segment fail its neighbours: retry them
+                # one by one so only the culprit gets the error.
+                logger.warning(f"Coalesced batch of {len(batch)} failed, retrying individually: {str(e)}")
+                for entry in batch:
+                    await self._run([entry])
+                return
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
+def create_request_coalescer(settings, executor: AnalysisExecutor) -> Optional[RequestCoalescer]:
+    if not settings.coalesce_enabled:
+        return None
+    logger.info(
+        f"Request coalescing enabled (max batch {settings.coalesce_max_batch}, "
+        f"max wait {settings.coalesce_max_wait_ms}ms)"
+    )
+    return RequestCoalescer(executor, settings.coalesce_max_batch, settings.coalesce_max_wait_ms)
@@ -0,0 +1,111 @@
+import asyncio
+import functools
+import gc
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Analysis queue is full")
+        self.retry_after = retry_after
+
+
+class AnalysisExecutor:
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64,
+        retry_after: int = 1,
+        initializer: Optional[Callable[[], None]] = None,
+        start_method: str = "fork",
+        bulk_workers: int = 1,
+    ):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.start_method = start_method
+        # Leave at least one worker to interactive traffic. A single-worker
+        # pool has no bulk lane: bulk tasks run one at a time, and only while
+        # the pool is idle.
+        self.bulk_workers = max(min(bulk_workers, max_workers - 1), 0)
+        self._pending = 0
+        self._bulk_slots = asyncio.Semaphore(self.bulk_workers or 1)
+        self._capacity = asyncio.Event()
+        self._pool = self._create_pool(initializer)
+        logger.info(
+            f"Analysis executor: {kind} pool, {max_workers} workers "
+            f"({self.bulk_workers or 'no dedicated worker'} for bulk), "
+            f"queue depth {max_queue}"
+        )
+
+    def _create_pool(self, initializer: Optional[Callable[[], None]]) -> Executor:
+        if self.kind == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=initializer,
+            )
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analysis")
+
+    def start(self) -> None:
+        if self.kind != "process":
+            return
+
+        if self.start_method == "fork":
+            # Move the loaded models out of the collector's reach so that
+            # GC passes in the children don't dirty the shared pages.
+            gc.freeze()
+        for future in [self._pool.submit(os.getpid) for _ in range(self.max_workers)]:
+            future.result()
+        logger.info(f"Started {len(self.worker_pids())} analysis worker processes ({self.start_method})")
+
+    def worker_pids(self) -> List[int]:
+        if self.kind != "process":
+            return []
+        return list(getattr(self._pool, "_processes", None) or {})
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_workers + self.max_queue:
+            raise QueueFullError(self.retry_after)
+        return await self._submit(fn, *args)
+
+    async def run_bulk(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # Background lane: waits instead of failing, runs on at most
+        # `bulk_workers` workers and is only handed to the pool while a worker
+        # is idle, so interactive requests never queue behind more than the
+        # bulk tasks already running.
+        async with self._bulk_slots:
+            while self._pending >= (self.max_workers if self.bulk_workers else 1):
+                self._capacity.clear()
+                await self._capacity.wait()
+            return await self._submit(fn, *args)
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(
+                metrics.instrumented, metrics.endpoint_var.get(), metrics.clock(), fn, *args
+            )
+            return await loop.run_in_executor(self._pool, call)
+        finally:
+            self._pending -= 1
+            if self._pending < self.max_workers:
+                self._capacity.set()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
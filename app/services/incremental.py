@@ -0,0 +1,210 @@
+from bisect import bisect_right
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.services.langid import split_sentences
+from app.services.spans import Span
+
+# Above this share of re-analyzed characters a plain full analysis is cheaper
+# than diffing and merging.
+MAX_CHANGED_RATIO = 0.5
+
+
+class Block(NamedTuple):
+    # Characters [old_start, old_end) of the previous text reappear unchanged
+    # at new_start in the new one.
+    old_start: int
+    old_end: int
+    new_start: int
+
+
+def diff_blocks(old_text: str, new_text: str) -> Tuple[List[Block], List[Tuple[int, int]]]:
+    # Sentence-level diff: returns the unchanged blocks and the changed
+    # sentence ranges of the new text (empty ranges mark pure deletions).
+    old_sentences = split_sentences(old_text)
+    new_sentences = split_sentences(new_text)
+    old_keys = [old_text[start:end] for start, end in old_sentences]
+    new_keys = [new_text[start:end] for start, end in new_sentences]
+
+    # Edits are usually local: match the untouched head and tail directly and
+    # only hand the middle to SequenceMatcher, which is quadratic in the
+    # worst case.
+    head = 0
+    limit = min(len(old_keys), len(new_keys))
+    while head < limit and old_keys[head] == new_keys[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old_keys[-1 - tail] == new_keys[-1 - tail]:
+        tail += 1
+    matcher = SequenceMatcher(
+        None, old_keys[head:len(old_keys) - tail], new_keys[head:len(new_keys) - tail], autojunk=False
+    )
+    opcodes = [("equal", 0, head, 0, head)] if head else []
+    opcodes += [
+        (tag, i1 + head, i2 + head, j1 + head, j2 + head) for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+    ]
+    if tail:
+        opcodes.append(("equal", len(old_keys) - tail, len(old_keys), len(new_keys) - tail, len(new_keys)))
+
+    blocks: List[Block] = []
+    changed: List[Tuple[int, int]] = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            blocks.append(Block(old_sentences[i1][0], old_sentences[i2 - 1][1], new_sentences[j1][0]))
+            continue
+        position = new_sentences[j1][0] if j1 < len(new_sentences) else len(new_text)
+        changed.append((position, new_sentences[j2 - 1][1] if j2 > j1 else position))
+    return blocks, changed
+
+
+def expand_windows(
+    text: str, changed: Sequence[Tuple[int, int]], context_sentences: int
+) -> List[Tuple[int, int]]:
+    # Widens every changed range by `context_sentences` whole sentences on
+    # each side (NER and context words look past the edit) and merges ranges
+    # that touch.
+    if not changed:
+        return []
+    sentences = split_sentences(text) or [(0, 0)]
+    starts = [start for start, _ in sentences]
+    windows: List[Tuple[int, int]] = []
+    for start, end in changed:
+        first = max(bisect_right(starts, start) - 1 - context_sentences, 0)
+        last = min(bisect_right(starts, max(end - 1, start)) - 1 + context_sentences, len(sentences) - 1)
+        window = (sentences[first][0], sentences[last][1])
+        if windows and window[0] <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], window[1]))
+        else:
+            windows.append(window)
+    return windows
+
+
+def _shift(block_starts: List[int], blocks: List[Block], start: int, end: int) -> Optional[Tuple[int, int]]:
+    pos = bisect_right(block_starts, start) - 1
+    if pos < 0:
+        return None
+    block = blocks[pos]
+    if end > block.old_end:
+        return None
+    delta = block.new_start - block.old_start
+    return start + delta, end + delta
+
+
+def _overlaps(windows: List[Tuple[int, int]], starts: List[int], start: int, end: int) -> Optional[int]:
+    pos = bisect_right(starts, max(end - 1, start)) - 1
+    if pos >= 0 and windows[pos][1] > start:
+        return pos
+    return None
+
+
+def carry_over(
+    revision: Dict[str, Any], blocks: List[Block], windows: List[Tuple[int, int]]
+) -> Tuple[List[Span], List[Tuple[int, int]], Dict[Tuple[int, int, str], int]]:
+    # Moves the previous raw spans and placeholder indices into new-text
+    # coordinates. Spans that don't sit in one unchanged block are dropped;
+    # windows grow to fully cover any kept span they touch, so a window never
+    # re-analyzes half an entity.
+    block_starts = [block.old_start for block in blocks]
+    moved: List[Tuple[str, int, int, float]] = []
+    for entity_type, start, end, score in revision["spans"]:
+        shifted = _shift(block_starts, blocks, start, end)
+        if shifted is not None:
+            moved.append((entity_type, shifted[0], shifted[1], score))
+
+    windows = list(windows)
+    starts = [window[0] for window in windows]
+    for _, start, end, _ in moved:
+        pos = _overlaps(windows, starts, start, end)
+        if pos is not None:
+            windows[pos] = (min(windows[pos][0], start), max(windows[pos][1], end))
+            starts[pos] = windows[pos][0]
+    merged: List[Tuple[int, int]] = []
+    for window in sorted(windows):
+        if merged and window[0] <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], window[1]))
+        else:
+            merged.append(window)
+
+    merged_starts = [window[0] for window in merged]
+    kept = [
+        Span(entity_type, start, end, score)
+        for entity_type, start, end, score in moved
+        if _overlaps(merged, merged_starts, start, end) is None
+    ]
+    indices: Dict[Tuple[int, int, str], int] = {}
+    for start, end, entity_type, index in revision["mappings"]:
+        shifted = _shift(block_starts, blocks, start, end)
+        if shifted is not None:
+            indices[(shifted[0], shifted[1], entity_type)] = index
+    return kept, merged, indices
+
+
+def assign_indices(
+    text: str,
+    spans: Sequence[Any],
+    revision: Optional[Dict[str, Any]],
+    indices: Dict[Tuple[int, int, str], int],
+) -> Tuple[List[int], int]:
+    # Spans that survived the edit keep their placeholder index. Re-detected
+    # entities inside the edited windows take back the index of a previous
+    # entity with the same type and text; everything else gets a fresh one.
+    # Indices are never reused, so stale MT output can't pick up a new value.
+    if revision is None:
+        return list(range(len(spans))), len(spans)
+
+    previous_text = revision["text"]
+    taken = set()
+    by_value: Dict[Tuple[str, str], List[int]] = {}
+    for start, end, entity_type, index in revision["mappings"]:
+        by_value.setdefault((entity_type, previous_text[start:end]), []).append(index)
+
+    assigned: List[Optional[int]] = []
+    for span in spans:
+        index = indices.get((span.start, span.end, span.entity_type))
+        if index is not None and index not in taken:
+            taken.add(index)
+        else:
+            index = None
+        assigned.append(index)
+
+    next_index = revision["next_index"]
+    for pos, span in enumerate(spans):
+        if assigned[pos] is not None:
+            continue
+        candidates = [
+            index for index in by_value.get((span.entity_type, text[span.start:span.end]), ())
+            if index not in taken
+        ]
+        if candidates:
+            assigned[pos] = candidates[0]
+        else:
+            assigned[pos] = next_index
+            next_index += 1
+        taken.add(assigned[pos])
+    return assigned, next_index
+
+
+def make_revision(
+    text: str,
+    language: str,
+    entities: Optional[List[str]],
+    pattern_only: bool,
+    raw_results: Sequence[Span],
+    mappings: Sequence[Dict[str, Any]],
+    next_index: int,
+) -> Dict[str, Any]:
+    return {
+        "text": text,
+        "language": language,
+        "entities": list(entities) if entities else None,
+        "pattern_only": pattern_only,
+        "spans": [[res.entity_type, res.start, res.end, res.score] for res in raw_results],
+        "mappings": [
+            [
+                mapping["start"], mapping["end"], mapping["entity_type"],
+                int(mapping["placeholder"][len(mapping["entity_type"]) + 2:-1]),
+            ]
+            for mapping in mappings
+        ],
+        "next_index": next_index,
+    }
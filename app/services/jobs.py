@@ -0,0 +1,384 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import re
+import secrets
+import shutil
+import time
+from bisect import bisect_right
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from app.services import metrics, workers
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATES = {"completed", "failed", "cancelled"}
+JOB_ID_RE = re.compile(r"[0-9a-f]{16}")
+JOBS_POLL_SECONDS = 5
+
+
+def _write_json(path: str, value: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(value, f)
+    os.replace(tmp_path, path)
+
+
+# Each job is a directory under `root`:
+#   input.jsonl   submitted segments, one TranslationAnonymizeRequest per line
+#   output.jsonl  one result record per processed input line, in order
+#   index         "<lines done> <output offset>" after every chunk, for seeking
+#   state.json    status and the input/output offsets reached so far
+#   lock          flock()ed by the process uploading or running the job
+#   cancel        present once a cancel was requested while the job was locked
+# state.json is only rewritten after the chunk's output is flushed, so on a
+# restart the output is truncated back to it and processing resumes from the
+# recorded input offset without losing or repeating lines.
+#
+# The directory is the only source of truth, so every server process (e.g.
+# uvicorn --workers N) sees the same jobs. The flock is taken non-blocking,
+# so a job runs in one process at a time, and the kernel drops it when its
+# holder dies, which lets any process resume the job. All methods do file
+# I/O: call them off the event loop.
+class JobStore:
+    def __init__(self, root: str, ttl_seconds: int):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self._locks: Dict[str, int] = {}
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, job_id: str, name: str) -> str:
+        return os.path.join(self.root, job_id, name)
+
+    def load(self) -> None:
+        # Runs in every server process at start; jobs another live process
+        # holds are left alone.
+        for job_id in sorted(os.listdir(self.root)):
+            if not self.claim(job_id):
+                continue
+            state = self.read(job_id)
+            if state is None:
+                logger.warning(f"Dropping unreadable job directory {job_id}")
+                self.delete(job_id)
+            elif state["status"] == "receiving":
+                # The upload never finished; there's nothing to resume.
+                self.delete(job_id)
+            else:
+                if state["status"] == "running":
+                    state["status"] = "queued"
+                    self.save(state)
+                self.release(job_id)
+
+    def claim(self, job_id: str) -> bool:
+        if not JOB_ID_RE.fullmatch(job_id):
+            return False
+        try:
+            fd = os.open(self.path(job_id, "lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._locks[job_id] = fd
+        return True
+
+    def release(self, job_id: str) -> None:
+        fd = self._locks.pop(job_id, None)
+        if fd is not None:
+            os.close(fd)
+
+    def read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if not JOB_ID_RE.fullmatch(job_id):
+            return None
+        try:
+            with open(self.path(job_id, "state.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, state: Dict[str, Any]) -> None:
+        state["updated_at"] = time.time()
+        _write_json(self.path(state["id"], "state.json"), state)
+
+    def create(self, language: str) -> Dict[str, Any]:
+        # The uploader holds the job's lock until seal() or delete().
+        job_id = secrets.token_hex(8)
+        os.makedirs(os.path.join(self.root, job_id))
+        self.claim(job_id)
+        now = time.time()
+        state = {
+            "id": job_id,
+            "status": "receiving",
+            "language": language,
+            "total": 0,
+            "done": 0,
+            "errors": 0,
+            "input_offset": 0,
+            "output_offset": 0,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+        self.save(state)
+        return state
+
+    def write_input(self, state: Dict[str, Any], lines: Iterable[bytes]) -> None:
+        with open(self.path(state["id"], "input.jsonl"), "ab") as f:
+            for line in lines:
+                if line.strip():
+                    f.write(line.rstrip(b"\r\n") + b"\n")
+                    state["total"] += 1
+
+    def seal(self, state: Dict[str, Any]) -> None:
+        open(self.path(state["id"], "output.jsonl"), "ab").close()
+        open(self.path(state["id"], "index"), "ab").close()
+        state["status"] = "queued" if state["total"] else "completed"
+        if not state["total"]:
+            state["finished_at"] = time.time()
+        self.save(state)
+        self.release(state["id"])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        state = self.read(job_id)
+        if state is not None and self.cancelled(job_id):
+            state["status"] = "cancelled"
+        return state
+
+    def list(self) -> List[Dict[str, Any]]:
+        states = (self.get(job_id) for job_id in os.listdir(self.root))
+        return sorted((state for state in states if state is not None), key=lambda state: state["created_at"])
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        # Oldest queued job, or a running one whose process died. Cancelled
+        # jobs their holder left behind are removed on the way.
+        for state in self.list():
+            job_id = state["id"]
+            pending = state["status"] in {"queued", "running"} or self.cancelled(job_id)
+            if not pending or not self.claim(job_id):
+                continue
+            state = self.read(job_id)
+            if self.cancelled(job_id):
+                self.delete(job_id)
+            elif state is not None and state["status"] in {"queued", "running"}:
+                return state
+            else:
+                self.release(job_id)
+        return None
+
+    def cancel(self, job_id: str) -> bool:
+        if self.read(job_id) is None:
+            return False
+        if self.claim(job_id):
+            self.delete(job_id)
+        else:
+            # Uploading or running elsewhere: the scheduler removes it after
+            # the chunk in flight.
+            open(self.path(job_id, "cancel"), "ab").close()
+        return True
+
+    def cancelled(self, job_id: str) -> bool:
+        return os.path.exists(self.path(job_id, "cancel"))
+
+    def delete(self, job_id: str) -> None:
+        shutil.rmtree(os.path.join(self.root, job_id), ignore_errors=True)
+        self.release(job_id)
+
+    def expire(self) -> None:
+        now = time.time()
+        for state in self.list():
+            # A cancel marker reports "cancelled" before the job's holder has
+            # finished it; the holder removes those itself.
+            if state["finished_at"] is None:
+                continue
+            if state["status"] in FINISHED_STATES and now - state["finished_at"] > self.ttl_seconds:
+                logger.info(f"Removing expired job {state['id']}")
+                self.delete(state["id"])
+
+    def read_results(self, state: Dict[str, Any], offset: int, limit: int) -> Iterator[bytes]:
+        # Only lines covered by state.json are served; a chunk being written
+        # right now is not visible yet.
+        end_line = min(offset + limit, state["done"])
+        if offset >= end_line:
+            return
+        done_marks, byte_marks = [0], [0]
+        with open(self.path(state["id"], "index")) as f:
+            for entry in f:
+                done, output_offset = map(int, entry.split())
+                if done > state["done"]:
+                    break
+                done_marks.append(done)
+                byte_marks.append(output_offset)
+
+        mark = bisect_right(done_marks, offset) - 1
+        line_no = done_marks[mark]
+        with open(self.path(state["id"], "output.jsonl"), "rb") as f:
+            f.seek(byte_marks[mark])
+            for line in f:
+                if line_no >= end_line:
+                    break
+                if line_no >= offset:
+                    yield line
+                line_no += 1
+
+
+def progress(state: Dict[str, Any]) -> Dict[str, Any]:
+    snapshot = {key: value for key, value in state.items() if key not in {"input_offset", "output_offset"}}
+    snapshot["percent"] = round(state["done"] * 100 / state["total"], 1) if state["total"] else 100.0
+    snapshot["segments_per_sec"] = None
+    snapshot["eta_seconds"] = None
+    started = state.get("run_started_at")
+    if state["status"] == "running" and started:
+        elapsed = time.time() - started
+        rate = (state["done"] - state.get("run_started_done", 0)) / elapsed if elapsed else 0.0
+        snapshot["segments_per_sec"] = round(rate, 1)
+        if rate:
+            snapshot["eta_seconds"] = round((state["total"] - state["done"]) / rate, 1)
+    return snapshot
+
+
+# Drains queued jobs in chunks of `chunk_lines` on the executor's bulk lane,
+# at most `max_running` jobs at a time, oldest first.
+class JobScheduler:
+    def __init__(self, store: JobStore, executor, chunk_lines: int, max_running: int):
+        self.store = store
+        self.executor = executor
+        self.chunk_lines = chunk_lines
+        self.max_running = max_running
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._runner()) for _ in range(self.max_running)]
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _runner(self) -> None:
+        metrics.endpoint_var.set("/jobs")
+        while True:
+            # Errors are logged per iteration, so one bad job directory can't
+            # stop scheduling in this process.
+            try:
+                await asyncio.to_thread(self.store.expire)
+            except Exception as e:
+                logger.exception(f"Expiring jobs failed: {str(e)}")
+            try:
+                state = await asyncio.to_thread(self.store.claim_next)
+            except Exception as e:
+                logger.exception(f"Claiming the next job failed: {str(e)}")
+                state = None
+            if state is None:
+                self._wakeup.clear()
+                try:
+                    # Jobs submitted to other server processes are picked up
+                    # on this poll.
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=JOBS_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(state)
+            except Exception as e:
+                logger.exception(f"Job {state['id']} failed: {str(e)}")
+            finally:
+                self.store.release(state["id"])
+
+    async def _run(self, state: Dict[str, Any]) -> None:
+        job_id = state["id"]
+        if state["status"] == "running":
+            logger.info(f"Resuming job {job_id} at line {state['done']} of {state['total']}")
+        state.update(status="running", run_started_at=time.time(), run_started_done=state["done"])
+        state["started_at"] = state["started_at"] or state["run_started_at"]
+        cancelled = False
+        try:
+            files = await asyncio.to_thread(self._open, state)
+            try:
+                while True:
+                    lines = await asyncio.to_thread(self._read_chunk, job_id, files[0])
+                    if lines is None:
+                        cancelled = True
+                        break
+                    if not lines:
+                        break
+                    output = await self.executor.run_bulk(
+                        workers.translation_anonymize_lines, lines, "jsonl", state["language"]
+                    )
+                    await asyncio.to_thread(self._write_chunk, state, len(lines), output, *files)
+            finally:
+                for f in files:
+                    f.close()
+        except asyncio.CancelledError:
+            # Server shutdown: leave the job for the next start to resume.
+            raise
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed: {str(e)}")
+            state.update(status="failed", error=str(e), finished_at=time.time())
+            await asyncio.to_thread(self.store.save, state)
+            return
+
+        if cancelled:
+            await asyncio.to_thread(self.store.delete, job_id)
+            return
+        state.update(status="completed", finished_at=time.time())
+        await asyncio.to_thread(self.store.save, state)
+        logger.info(f"Job {job_id} completed: {state['done']} segments, {state['errors']} errors")
+
+    def _open(self, state: Dict[str, Any]) -> Tuple[BinaryIO, BinaryIO, TextIO]:
+        self.store.save(state)
+        source = open(self.store.path(state["id"], "input.jsonl"), "rb")
+        sink = open(self.store.path(state["id"], "output.jsonl"), "r+b")
+        index = open(self.store.path(state["id"], "index"), "r+")
+        source.seek(state["input_offset"])
+        sink.truncate(state["output_offset"])
+        sink.seek(state["output_offset"])
+        self._truncate_index(index, state["done"])
+        return source, sink, index
+
+    def _read_chunk(self, job_id: str, source: BinaryIO) -> Optional[List[bytes]]:
+        # None once the job was cancelled.
+        if self.store.cancelled(job_id):
+            return None
+        return [line for line in (source.readline() for _ in range(self.chunk_lines)) if line]
+
+    def _write_chunk(
+        self, state: Dict[str, Any], lines: int, output: List[bytes], source: BinaryIO, sink: BinaryIO, index: TextIO
+    ) -> None:
+        sink.writelines(output)
+        sink.flush()
+        state["errors"] += sum(1 for line in output if line.startswith(b'{"error"'))
+        state.update(
+            done=state["done"] + lines,
+            input_offset=source.tell(),
+            output_offset=sink.tell(),
+        )
+        index.write(f"{state['done']} {state['output_offset']}\n")
+        index.flush()
+        self.store.save(state)
+
+    @staticmethod
+    def _truncate_index(index, done: int) -> None:
+        keep = 0
+        for entry in iter(index.readline, ""):
+            if int(entry.split()[0]) > done:
+                break
+            keep = index.tell()
+        index.seek(keep)
+        index.truncate()
+
+
+def create_job_store(settings) -> Optional[JobStore]:
+    if not settings.jobs_enabled:
+        return None
+    store = JobStore(settings.jobs_dir, settings.jobs_ttl_seconds)
+    store.load()
+    return store
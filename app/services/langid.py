@@ -0,0 +1,178 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.services import metrics
+from app.services.langid_profiles import WORDS
+
+AUTO = "auto"
+DETECTION_MODES = {"off", "auto", "always"}
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+
+# Letters needed before a guess is trusted, and the minimum log-likelihood
+# margin (in nats) between the best and the runner-up language.
+MIN_LETTERS = 12
+MIN_MARGIN = 2.0
+# Longer texts are identified from a prefix of this many characters.
+SAMPLE_CHARS = 2000
+
+
+class Run(NamedTuple):
+    start: int
+    end: int
+    language: str
+
+
+# Naive Bayes over character 1-3 grams of space-padded, lowercased words.
+# Profiles come from rank-weighted frequent-word lists; per-word scores are
+# memoized, since the same words keep coming back.
+class LanguageIdentifier:
+    def __init__(self, words: Dict[str, str] = WORDS, orders: Sequence[int] = (1, 2, 3), alpha: float = 0.1):
+        self.languages = list(words)
+        self.orders = tuple(orders)
+        counts: Dict[str, Counter] = {}
+        for language, text in words.items():
+            counts[language] = Counter()
+            for rank, word in enumerate(text.split()):
+                weight = 1.0 / (rank + 3)
+                for gram in self._grams(word):
+                    counts[language][gram] += weight
+
+        vocabulary = set().union(*counts.values())
+        self._floor: List[float] = []
+        self._bonus: Dict[str, Tuple[Tuple[int, float], ...]] = {}
+        bonus: Dict[str, List[Tuple[int, float]]] = {}
+        for idx, language in enumerate(self.languages):
+            total = sum(counts[language].values()) + alpha * len(vocabulary)
+            floor = math.log(alpha / total)
+            self._floor.append(floor)
+            for gram, count in counts[language].items():
+                bonus.setdefault(gram, []).append((idx, math.log((count + alpha) / total) - floor))
+        self._bonus = {gram: tuple(values) for gram, values in bonus.items()}
+        self._word_scores = lru_cache(maxsize=65536)(self._score_word)
+
+    def _grams(self, word: str) -> Iterable[str]:
+        padded = f" {word} "
+        for n in self.orders:
+            for i in range(len(padded) - n + 1):
+                gram = padded[i:i + n]
+                if gram != " ":
+                    yield gram
+
+    def _score_word(self, word: str) -> Tuple[int, Tuple[float, ...]]:
+        scores = [0.0] * len(self.languages)
+        grams = 0
+        for gram in self._grams(word):
+            grams += 1
+            for idx, value in self._bonus.get(gram, ()):
+                scores[idx] += value
+        return grams, tuple(scores)
+
+    def detect(self, text: str) -> Tuple[Optional[str], float]:
+        # Returns (language, margin), or (None, 0.0) when the text is too
+        # short or too ambiguous to call.
+        words = _WORD_RE.findall(text[:SAMPLE_CHARS].lower())
+        if sum(len(word) for word in words) < MIN_LETTERS:
+            return None, 0.0
+
+        grams = 0
+        scores = [0.0] * len(self.languages)
+        for word in words:
+            word_grams, word_scores = self._word_scores(word)
+            grams += word_grams
+            for idx, value in enumerate(word_scores):
+                scores[idx] += value
+        ranked = sorted(
+            ((score + grams * floor, idx) for idx, (score, floor) in enumerate(zip(scores, self._floor))),
+            reverse=True,
+        )
+        margin = ranked[0][0] - ranked[1][0]
+        if margin < MIN_MARGIN:
+            return None, margin
+        return self.languages[ranked[0][1]], margin
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    spans = []
+    start = 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        spans.append((start, match.end()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+# Maps a segment to the configured pipelines: the whole segment to one
+# language, or consecutive sentences to different ones when a segment mixes
+# languages. Languages without a pipeline go to `fallback` (the multilingual
+# "xx" model when configured).
+class LanguageRouter:
+    def __init__(
+        self,
+        supported_languages: Iterable[str],
+        mode: str = AUTO,
+        split_sentences: bool = True,
+        identifier: Optional[LanguageIdentifier] = None,
+    ):
+        if mode not in DETECTION_MODES:
+            raise ValueError(f"Unknown language detection mode '{mode}', expected one of {sorted(DETECTION_MODES)}")
+        self.supported = list(supported_languages)
+        self.fallback = "xx" if "xx" in self.supported else self.supported[0]
+        self.mode = mode
+        self.split_sentences = split_sentences
+        self.identifier = identifier or (LanguageIdentifier() if mode != "off" else None)
+
+    def wants_detection(self, language: Optional[str]) -> bool:
+        if self.mode == "off":
+            return False
+        if self.mode == "always":
+            return True
+        return not language or language == AUTO or language == self.fallback
+
+    def _pipeline(self, detected: Optional[str]) -> Optional[str]:
+        if detected is None:
+            return None
+        return detected if detected in self.supported else self.fallback
+
+    def route(self, text: str, language: Optional[str], whole: bool = False) -> List[Run]:
+        # `whole` skips per-sentence routing, e.g. for chunked long documents.
+        default = language if language and language != AUTO else self.fallback
+        if not self.wants_detection(language):
+            return [Run(0, len(text), default)]
+
+        start = metrics.clock()
+        sentences = [(0, len(text))] if whole or not self.split_sentences else split_sentences(text)
+        runs: List[Run] = []
+        for sentence_start, sentence_end in sentences:
+            detected = self._pipeline(self.identifier.detect(text[sentence_start:sentence_end])[0])
+            if detected is None:
+                continue
+            if runs and runs[-1].language == detected:
+                continue
+            if runs:
+                runs[-1] = runs[-1]._replace(end=sentence_start)
+            runs.append(Run(sentence_start if runs else 0, len(text), detected))
+        # Sentences too short to call join the run before them (or the first
+        # run when they lead the segment).
+        if not runs and len(sentences) > 1:
+            detected = self._pipeline(self.identifier.detect(text)[0])
+            runs = [Run(0, len(text), detected)] if detected else []
+        if not runs:
+            runs = [Run(0, len(text), default)]
+        metrics.observe_stage(runs[0].language if len(runs) == 1 else "mixed", "langid", metrics.clock() - start)
+        return runs
+
+
+def create_language_router(settings, supported_languages: Iterable[str]) -> Optional[LanguageRouter]:
+    if settings.language_detection == "off":
+        return None
+    return LanguageRouter(
+        supported_languages,
+        mode=settings.language_detection,
+        split_sentences=settings.language_detection_sentences,
+    )
@@ -0,0 +1,77 @@
+# Frequent words per language, most frequent first. The language identifier
+# derives its character trigram profiles from these lists (weighted by rank),
+# which is enough to tell these languages apart on sentence-length input
+# without shipping a trained model.
+WORDS = {
+    "en": (
+        "the of and to a in is that for it as was with be by on not he this are or his from at which but "
+        "have an they you were her she there been one all we their has would when if so no will can more "
+        "who what out about up them some could him into its then two time only other new these may like "
+        "than first any my now such people very after over also did where most much should well how our "
+        "through back years work way because just those your me made here between still being both under "
+        "while day must each get make know going think"
+    ),
+    "de": (
+        "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an werden "
+        "aus er hat dass sie nach wird bei einer um am sind noch wie einem über einen so zum war haben nur "
+        "oder aber vor zur bis mehr durch man sein wurde sei prozent hatte kann gegen vom können schon wenn "
+        "habe seine ihre dann unter wir soll ich eines jahr zwei jahren diese dieser wieder keine seiner "
+        "worden will zwischen immer was sagte gibt alle diesem seit muss wurden beim doch jetzt ihrer "
+        "bitte woche nächste straße größe"
+    ),
+    "fr": (
+        "de la le et les des en un du une que est pour qui dans a par plus pas au sur ne se il sont ce "
+        "avec ou son elle mais comme on tout nous sa aux leur été ont cette fait ses deux même entre "
+        "aussi bien peut ces sans autres après lui très sous leurs depuis où être dont ans nos faire "
+        "avant encore alors tous notre vous je fois avait premier aux quand ainsi chez contre cela "
+        "merci semaine prochaine à déjà français"
+    ),
+    "es": (
+        "de la que el en y a los del se las por un para con no una su al lo como más pero sus le ya o "
+        "este sí porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos "
+        "durante todos uno les ni contra otros ese eso ante ellos e esto mí antes algunos qué unos yo "
+        "otro otras otra él tanto esa estos mucho quienes nada muchos cual poco ella estar estas algunas "
+        "algo nosotros año señor niño"
+    ),
+    "it": (
+        "di e il la che in a per un è del non una con sono le si da i al della anche come ma più dei "
+        "nel lo alla gli se questo ha ci essere o delle quando nella suo sua degli ancora stato loro "
+        "tra dopo fatto molto così ne dal fra cui tutto solo due prima anni poi sempre ogni parte "
+        "hanno questa tutti perché dove però cosa chi nostro nostra mentre sia erano lavoro grazie "
+        "settimana città"
+    ),
+    "pt": (
+        "de a o que e do da em um para é com não uma os no se na por mais as dos como mas foi ao ele das "
+        "tem à seu sua ou ser quando muito há nos já está eu também só pelo pela até isso ela entre era "
+        "depois sem mesmo aos ter seus quem nas me esse eles estão você tinha foram essa num nem suas "
+        "meu às minha têm numa pelos elas havia seja qual será nós tenho lhe deles essas esses pelas "
+        "este fosse dele obrigado semana não são então"
+    ),
+    "nl": (
+        "de van een het en in is dat op te zijn voor met die niet aan er om ook als dan maar bij of uit "
+        "nog door naar heeft tot ze wordt over hij nu zo al wel worden meer jaar kan had was geen deze "
+        "moet na zijn wat we hun haar mijn onze zou hebben veel waren toen werd kunnen alleen twee "
+        "tussen omdat zonder iets waar heel vanaf altijd daar hier zij jullie ons bent ben wij gaat "
+        "volgende week bedankt"
+    ),
+    "pl": (
+        "w i na nie z się do to że jest o jak a co po tak za od ale przez dla jego tym czy już roku było "
+        "może są jej lub go tylko być oraz był które przy jednak który także tego ich gdy bardzo bo "
+        "została został jako tej jeszcze kiedy mnie można będzie były której więc między gdzie teraz "
+        "ponieważ pod nad bez przed nawet potem zawsze proszę tydzień dziękuję również"
+    ),
+    "ru": (
+        "и в не на я что он с как а то все она так его но да ты к у же вы за бы по только ее мне было "
+        "вот от меня еще нет о из ему теперь когда даже ну вдруг ли если уже или ни быть был него до "
+        "вас нибудь опять уж вам ведь там потом себя ничего ей может они тут где есть надо ней для мы "
+        "тебя их чем была сам чтоб без будто чего раз тоже себе под будет тогда кто этот того потому "
+        "этого какой совсем ним здесь этом один почти мой тем чтобы нее сейчас были куда зачем всех "
+        "пожалуйста неделю наша"
+    ),
+    "uk": (
+        "і в не на що з він я як та до це а але за у його так від все її вона для мене було ти є про "
+        "вже коли бо щоб ми їх то вони або ще якщо було може тільки де тому цей після ні через також "
+        "який яка які своїх свою себе між бути дуже їй нам вас них ним цього цієї року році під над "
+        "будь ласка наступного тижня наша дякую їхній українська"
+    ),
+}
@@ -0,0 +1,245 @@
+import gc
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import spacy
+from presidio_analyzer import AnalyzerEngineProvider
+from presidio_analyzer.nlp_engine import NerModelConfiguration, NlpEngine, NlpEngineProvider, SpacyNlpEngine
+from spacy.language import Language
+
+from app.services.memory import process_memory
+
+logger = logging.getLogger(__name__)
+
+ALL_LANGUAGES = "*"
+
+
+# spaCy pipelines keyed by language, loaded on first access. Languages outside
+# the warm set are dropped again once idle for `idle_seconds`, or least
+# recently used first when the loaded pipelines exceed `memory_budget_bytes`.
+class LanguagePipelines(Mapping):
+    def __init__(
+        self,
+        models: Dict[str, str],
+        loader: Callable[[str], Language],
+        warm_languages: Iterable[str] = (ALL_LANGUAGES,),
+        idle_seconds: int = 0,
+        memory_budget_bytes: int = 0,
+    ):
+        warm = set(warm_languages)
+        self._models = models
+        self._loader = loader
+        self.warm = set(models) if ALL_LANGUAGES in warm else warm & set(models)
+        self.idle_seconds = idle_seconds
+        self.memory_budget_bytes = memory_budget_bytes
+        self._pipelines: Dict[str, Language] = {}
+        self._state: Dict[str, Dict[str, Any]] = {
+            language: {"state": "unloaded", "size_bytes": 0, "load_seconds": None, "last_used": None, "error": None}
+            for language in models
+        }
+        self._lock = threading.Lock()
+        self._load_locks = {language: threading.Lock() for language in models}
+        self._sweeper_pid: Optional[int] = None
+
+    def __getitem__(self, language: str) -> Language:
+        pipeline = self._pipelines.get(language)
+        if pipeline is None:
+            if language not in self._models:
+                raise KeyError(language)
+            pipeline = self._load(language)
+        self._state[language]["last_used"] = time.monotonic()
+        return pipeline
+
+    def __contains__(self, language: object) -> bool:
+        return language in self._models
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._models)
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __bool__(self) -> bool:
+        # SpacyNlpEngine treats a falsy `nlp` as "not loaded".
+        return True
+
+    def loaded(self) -> List[str]:
+        return list(self._pipelines)
+
+    def warm_up(self) -> None:
+        for language in self._models:
+            if language in self.warm:
+                self[language]
+
+    def _load(self, language: str) -> Language:
+        with self._load_locks[language]:
+            pipeline = self._pipelines.get(language)
+            if pipeline is not None:
+                return pipeline
+
+            state = self._state[language]
+            state.update(state="loading", error=None)
+            rss_before = process_memory().get("rss", 0)
+            start = time.perf_counter()
+            try:
+                pipeline = self._loader(self._models[language])
+            except Exception as e:
+                state.update(state="failed", error=str(e))
+                logger.error(f"Failed to load spaCy pipeline for '{language}': {str(e)}")
+                raise
+            state.update(
+                state="ready",
+                size_bytes=max(process_memory().get("rss", 0) - rss_before, 0),
+                load_seconds=round(time.perf_counter() - start, 3),
+                last_used=time.monotonic(),
+            )
+            self._pipelines[language] = pipeline
+            logger.info(
+                f"Loaded spaCy pipeline for '{language}' ({self._models[language]}) in "
+                f"{state['load_seconds']:.1f}s, ~{state['size_bytes'] / 2**20:.0f} MB"
+            )
+
+        if language not in self.warm:
+            self._enforce_budget(keep=language)
+            self._start_sweeper()
+        return pipeline
+
+    def _evict(self, language: str, reason: str) -> None:
+        with self._lock:
+            if self._pipelines.pop(language, None) is None:
+                return
+            self._state[language].update(state="unloaded", last_used=None)
+        gc.collect()
+        logger.info(f"Evicted spaCy pipeline for '{language}' ({reason})")
+
+    def _enforce_budget(self, keep: str) -> None:
+        if not self.memory_budget_bytes:
+            return
+        while sum(self._state[lang]["size_bytes"] for lang in self._pipelines) > self.memory_budget_bytes:
+            candidates = [lang for lang in self._pipelines if lang not in self.warm and lang != keep]
+            if not candidates:
+                return
+            self._evict(min(candidates, key=lambda lang: self._state[lang]["last_used"] or 0), "memory budget")
+
+    def evict_idle(self) -> None:
+        if not self.idle_seconds:
+            return
+        now = time.monotonic()
+        for language in list(self._pipelines):
+            last_used = self._state[language]["last_used"]
+            if language not in self.warm and last_used is not None and now - last_used > self.idle_seconds:
+                self._evict(language, f"idle for {int(now - last_used)}s")
+
+    def _start_sweeper(self) -> None:
+        # Threads don't survive fork, so each worker process runs its own.
+        if not self.idle_seconds or self._sweeper_pid == os.getpid():
+            return
+        self._sweeper_pid = os.getpid()
+        interval = max(min(self.idle_seconds / 4, 60), 1)
+
+        def sweep():
+            while True:
+                time.sleep(interval)
+                self.evict_idle()
+
+        threading.Thread(target=sweep, name="pipeline-sweeper", daemon=True).start()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        return {
+            language: {
+                "state": state["state"],
+                "ready": state["state"] == "ready",
+                "warm": language in self.warm,
+                "model": self._models[language],
+                "size_mb": round(state["size_bytes"] / 2**20, 1),
+                "load_seconds": state["load_seconds"],
+                "idle_seconds": round(now - state["last_used"], 1) if state["last_used"] is not None else None,
+                "error": state["error"],
+            }
+            for language, state in self._state.items()
+        }
+
+
+class LazySpacyNlpEngine(SpacyNlpEngine):
+    def __init__(
+        self,
+        models: Optional[List[Dict[str, str]]] = None,
+        ner_model_configuration: Optional[NerModelConfiguration] = None,
+        warm_languages: Iterable[str] = (ALL_LANGUAGES,),
+        idle_seconds: int = 0,
+        memory_budget_bytes: int = 0,
+    ):
+        super().__init__(models=models, ner_model_configuration=ner_model_configuration)
+        self.warm_languages = list(warm_languages)
+        self.idle_seconds = idle_seconds
+        self.memory_budget_bytes = memory_budget_bytes
+
+    def load(self) -> None:
+        self._enable_gpu()
+        for model in self.models:
+            self._validate_model_params(model)
+        self.nlp = LanguagePipelines(
+            {model["lang_code"]: model["model_name"] for model in self.models},
+            self._load_model,
+            warm_languages=self.warm_languages,
+            idle_seconds=self.idle_seconds,
+            memory_budget_bytes=self.memory_budget_bytes,
+        )
+        self.nlp.warm_up()
+
+    def _load_model(self, model_name: str) -> Language:
+        self._download_spacy_model_if_needed(model_name)
+        return spacy.load(model_name)
+
+
+class LazyAnalyzerEngineProvider(AnalyzerEngineProvider):
+    def __init__(
+        self,
+        *args,
+        warm_languages: Iterable[str] = (ALL_LANGUAGES,),
+        idle_seconds: int = 0,
+        memory_budget_bytes: int = 0,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.warm_languages = list(warm_languages)
+        self.idle_seconds = idle_seconds
+        self.memory_budget_bytes = memory_budget_bytes
+
+    def _load_nlp_engine(self) -> NlpEngine:
+        if "nlp_configuration" in self.configuration:
+            nlp_configuration = NlpEngineProvider(nlp_configuration=self.configuration["nlp_configuration"]).nlp_configuration
+        else:
+            nlp_configuration = NlpEngineProvider(conf_file=self.nlp_engine_conf_file).nlp_configuration
+        if nlp_configuration["nlp_engine_name"] != LazySpacyNlpEngine.engine_name:
+            logger.warning(f"Lazy loading is only supported for spaCy, loading {nlp_configuration['nlp_engine_name']} eagerly")
+            return super()._load_nlp_engine()
+
+        ner_model_configuration = nlp_configuration.get("ner_model_configuration")
+        engine = LazySpacyNlpEngine(
+            models=nlp_configuration["models"],
+            ner_model_configuration=(
+                NerModelConfiguration.from_dict(ner_model_configuration) if ner_model_configuration else None
+            ),
+            warm_languages=self.warm_languages,
+            idle_seconds=self.idle_seconds,
+            memory_budget_bytes=self.memory_budget_bytes,
+        )
+        engine.load()
+        logger.info(f"spaCy pipelines warm: {engine.nlp.loaded()}, on demand: {sorted(set(engine.nlp) - set(engine.nlp.loaded()))}")
+        return engine
+
+
+def language_status(engine) -> Dict[str, Dict[str, Any]]:
+    pipelines = getattr(engine.nlp_engine, "nlp", None)
+    if isinstance(pipelines, LanguagePipelines):
+        return pipelines.status()
+    return {
+        language: {"state": "ready", "ready": True, "warm": True}
+        for language in engine.supported_languages
+    }
@@ -0,0 +1,96 @@
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Request size limits (0 disables each). MAX_BATCH_BYTES caps whole request
+# bodies, MAX_TEXT_BYTES single texts (UTF-8), MAX_BATCH_ITEMS the length of
+# batch arrays. Streamed NDJSON bodies aren't capped in total, only per line.
+MAX_TEXT_BYTES = settings.max_text_bytes
+MAX_BATCH_ITEMS = settings.max_batch_items or None
+MAX_BATCH_BYTES = settings.max_batch_bytes
+
+# Endpoints that consume the body line by line (always, or when it's NDJSON).
+STREAMING_PATHS = {"/anonymize/batch/stream"}
+NDJSON_PATHS = {"/jobs"}
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+def check_text(text: str) -> str:
+    # UTF-8 takes 1 to 4 bytes per character, so most texts are settled by
+    # their length alone and only borderline ones get encoded.
+    if not MAX_TEXT_BYTES or len(text) * 4 <= MAX_TEXT_BYTES:
+        return text
+    if len(text) > MAX_TEXT_BYTES or len(text.encode("utf-8", "surrogatepass")) > MAX_TEXT_BYTES:
+        raise ValueError(f"Text exceeds the {MAX_TEXT_BYTES}-byte limit (MAX_TEXT_BYTES)")
+    return text
+
+
+async def validation_error_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+    # FastAPI's default 422 echoes each failing input, which here is the text
+    # (or for an over-long batch, every item) the caller wanted anonymized.
+    # pydantic checks a list's length before its items, so an over-long batch
+    # fails fast with a single too_long error on the body.
+    errors = exc.errors()
+    if any(error["type"] == "too_long" and tuple(error["loc"]) == ("body",) for error in errors):
+        return JSONResponse(status_code=422, content={"detail": "too many items", "limit": MAX_BATCH_ITEMS})
+    return JSONResponse(
+        status_code=422,
+        content={"detail": jsonable_encoder([{k: v for k, v in error.items() if k != "input"} for error in errors])},
+    )
+
+
+def _too_large(limit: int) -> str:
+    return f"Request body exceeds the {limit}-byte limit (MAX_BATCH_BYTES)"
+
+
+class BodySizeLimitMiddleware:
+    # Rejects oversized bodies with 413 before they're buffered: up front from
+    # Content-Length, otherwise as soon as the received bytes pass the limit
+    # (FastAPI lets the HTTPException raised from receive() through).
+    def __init__(self, app: ASGIApp, max_bytes: int = MAX_BATCH_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.max_bytes or self._streaming(scope):
+            await self.app(scope, receive, send)
+            return
+
+        length = self._header(scope, b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            response = JSONResponse(status_code=413, content={"detail": _too_large(self.max_bytes)})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=_too_large(self.max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _streaming(self, scope: Scope) -> bool:
+        if scope["path"] in STREAMING_PATHS:
+            return True
+        return scope["path"] in NDJSON_PATHS and (self._header(scope, b"content-type") or "").startswith(NDJSON_TYPES)
+
+    @staticmethod
+    def _header(scope: Scope, name: bytes) -> Optional[str]:
+        for key, value in scope["headers"]:
+            if key == name:
+                return value.decode("latin-1")
+        return None
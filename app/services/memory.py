@@ -0,0 +1,27 @@
+import os
+from typing import Dict, Optional
+
+_SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, int]:
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    if not os.path.exists(path):
+        return {}
+
+    memory: Dict[str, int] = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].rstrip(":") in _SMAPS_FIELDS:
+                memory[_SMAPS_FIELDS[parts[0].rstrip(":")]] = int(parts[1]) * 1024
+    memory["shared"] = memory.get("shared_clean", 0) + memory.get("shared_dirty", 0)
+    memory["private"] = memory.get("private_clean", 0) + memory.get("private_dirty", 0)
+    return memory
@@ -0,0 +1,218 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+logger = logging.getLogger(__name__)
+
+# All stage timings use perf_counter, which is CLOCK_MONOTONIC on Linux and
+# therefore comparable across the server and its forked workers.
+clock = time.perf_counter
+
+# Route template of the request being served. Work outside any request
+# (startup warm-up, the bulk CLI) leaves it unset and isn't recorded.
+endpoint_var: ContextVar[Optional[str]] = ContextVar("metrics_endpoint", default=None)
+
+_SECONDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# There is one recognizer series per language and recognizer (hundreds),
+# so they get coarser buckets and no endpoint label.
+_RECOGNIZER_SECONDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.25, 1)
+_CHARS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+_COUNTS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+_BATCH = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+_RATIO = (0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1)
+
+REQUEST_SECONDS = Histogram(
+    "anonymizer_request_seconds", "HTTP request latency",
+    ["endpoint", "method", "status"], buckets=_SECONDS,
+)
+STAGE_SECONDS = Histogram(
+    "anonymizer_stage_seconds", "Time per pipeline stage (nlp, context, anonymize)",
+    ["endpoint", "language", "stage"], buckets=_SECONDS,
+)
+RECOGNIZER_SECONDS = Histogram(
+    "anonymizer_recognizer_seconds", "Time per recognizer call",
+    ["language", "recognizer"], buckets=_RECOGNIZER_SECONDS,
+)
+TEXT_LENGTH = Histogram(
+    "anonymizer_text_length_chars", "Length of analyzed texts",
+    ["endpoint", "language"], buckets=_CHARS,
+)
+ENTITY_COUNT = Histogram(
+    "anonymizer_entity_count", "Entities detected per text",
+    ["endpoint", "language"], buckets=_COUNTS,
+)
+BATCH_SIZE = Histogram(
+    "anonymizer_batch_size", "Items per batch request",
+    ["endpoint"], buckets=_BATCH,
+)
+BATCH_DEDUP_RATIO = Histogram(
+    "anonymizer_batch_dedup_ratio", "Share of batch items answered from an identical item in the same batch",
+    ["endpoint"], buckets=_RATIO,
+)
+REANALYZED_RATIO = Histogram(
+    "anonymizer_reanalyzed_ratio", "Share of an edited segment re-analyzed against its previous revision",
+    ["endpoint"], buckets=_RATIO,
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "anonymizer_queue_wait_seconds", "Time between submission and start on an analysis worker",
+    ["endpoint"], buckets=_SECONDS,
+)
+CACHE_REQUESTS = Counter(
+    "anonymizer_cache_requests", "Result cache lookups",
+    ["endpoint", "result"],
+)
+
+
+def observe_stage(language: str, stage: str, seconds: float) -> None:
+    endpoint = endpoint_var.get()
+    if endpoint is not None:
+        STAGE_SECONDS.labels(endpoint, language, stage).observe(seconds)
+
+
+def observe_text(language: str, length: int) -> None:
+    endpoint = endpoint_var.get()
+    if endpoint is not None:
+        TEXT_LENGTH.labels(endpoint, language).observe(length)
+
+
+def observe_entities(language: str, count: int) -> None:
+    endpoint = endpoint_var.get()
+    if endpoint is not None:
+        ENTITY_COUNT.labels(endpoint, language).observe(count)
+
+
+def observe_batch(size: int) -> None:
+    endpoint = endpoint_var.get()
+    if endpoint is not None:
+        BATCH_SIZE.labels(endpoint).observe(size)
+
+
+def observe_dedup(ratio: float) -> None:
+    endpoint = endpoint_var.get()
+    if endpoint is not None:
+        BATCH_DEDUP_RATIO.labels(endpoint).observe(ratio)
+
+
+def observe_reanalyzed(ratio: float) -> None:
+    endpoint = endpoint_var.get()
+    if endpoint is not None:
+        REANALYZED_RATIO.labels(endpoint).observe(ratio)
+
+
+def observe_cache(hit: bool) -> None:
+    endpoint = endpoint_var.get()
+    if endpoint is not None:
+        CACHE_REQUESTS.labels(endpoint, "hit" if hit else "miss").inc()
+
+
+def instrumented(endpoint: Optional[str], submitted_at: float, fn: Callable[..., Any], *args: Any) -> Any:
+    # Runs on the analysis worker: thread and process pools don't inherit the
+    # request's context, so the endpoint label is handed over explicitly.
+    if endpoint is not None:
+        QUEUE_WAIT_SECONDS.labels(endpoint).observe(max(clock() - submitted_at, 0.0))
+    token = endpoint_var.set(endpoint)
+    try:
+        return fn(*args)
+    finally:
+        endpoint_var.reset(token)
+
+
+def _timed_recognizer(recognizer, analyze: Callable) -> Callable:
+    name = recognizer.name
+    language = recognizer.supported_language
+    # labels() takes a lock and builds a key on every call; recognizers run
+    # dozens of times per text, so keep the child. It's created on first use
+    # so recognizers that never run don't export empty series.
+    child = None
+
+    @wraps(analyze)
+    def timed(*args, **kwargs):
+        nonlocal child
+        start = clock()
+        try:
+            return analyze(*args, **kwargs)
+        finally:
+            if endpoint_var.get() is not None:
+                if child is None:
+                    child = RECOGNIZER_SECONDS.labels(language, name)
+                child.observe(clock() - start)
+
+    return timed
+
+
+def _timed_process_text(process_text: Callable) -> Callable:
+    @wraps(process_text)
+    def timed(text: str, language: str):
+        start = clock()
+        try:
+            return process_text(text, language)
+        finally:
+            observe_stage(language, "nlp", clock() - start)
+
+    return timed
+
+
+def _timed_process_batch(process_batch: Callable) -> Callable:
+    @wraps(process_batch)
+    def timed(texts: Iterable[str], language: str, *args, **kwargs) -> Iterator[Tuple[str, Any]]:
+        # process_batch is lazy; charge each document the time spent producing it.
+        batch = iter(process_batch(texts, language, *args, **kwargs))
+        while True:
+            start = clock()
+            try:
+                item = next(batch)
+            except StopIteration:
+                return
+            observe_stage(language, "nlp", clock() - start)
+            yield item
+
+    return timed
+
+
+def _timed_enhancer(enhance: Callable) -> Callable:
+    @wraps(enhance)
+    def timed(text, raw_results, nlp_artifacts, recognizers, context=None):
+        # NlpArtifacts don't record their language; the recognizers passed in
+        # are the ones selected for it.
+        language = recognizers[0].supported_language if recognizers else "unknown"
+        start = clock()
+        try:
+            return enhance(text, raw_results, nlp_artifacts, recognizers, context)
+        finally:
+            observe_stage(language, "context", clock() - start)
+
+    return timed
+
+
+def install_metrics(engine) -> None:
+    nlp_engine = engine.nlp_engine
+    nlp_engine.process_text = _timed_process_text(nlp_engine.process_text)
+    nlp_engine.process_batch = _timed_process_batch(nlp_engine.process_batch)
+
+    engine._enhance_using_context = _timed_enhancer(engine._enhance_using_context)
+
+    recognizers = engine.registry.recognizers
+    for recognizer in recognizers:
+        recognizer.analyze = _timed_recognizer(recognizer, recognizer.analyze)
+    logger.info(f"Metrics instrumentation installed on {len(recognizers)} recognizers")
+
+
+def render() -> Tuple[bytes, str]:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,59 @@
+from typing import List, Optional, Set
+
+from presidio_analyzer import AnalyzerEngine
+from presidio_analyzer.nlp_engine import NlpArtifacts
+from presidio_analyzer.predefined_recognizers import SpacyRecognizer
+
+from app.services import metrics
+
+NLP_PROFILES = {"full", "auto", "pattern"}
+
+
+def ner_entities(engine: AnalyzerEngine, language: str) -> Set[str]:
+    entities: Set[str] = set()
+    for recognizer in engine.registry.get_recognizers(language=language, all_fields=True):
+        if isinstance(recognizer, SpacyRecognizer):
+            entities.update(recognizer.supported_entities)
+    return entities
+
+
+def use_pattern_only(
+    engine: AnalyzerEngine,
+    language: str,
+    entities: Optional[List[str]],
+    pattern_only: Optional[bool],
+    profile: str,
+) -> bool:
+    if pattern_only is not None:
+        return pattern_only
+    if profile == "pattern":
+        return True
+    if profile == "auto" and entities:
+        return not set(entities) & ner_entities(engine, language)
+    return False
+
+
+def tokenize_only(engine: AnalyzerEngine, text: str, language: str) -> NlpArtifacts:
+    # Only the tokenizer runs, so context enhancement still sees the
+    # surrounding words; lowercased tokens stand in for lemmas.
+    pipelines = getattr(engine.nlp_engine, "nlp", None) or {}
+    if language in pipelines:
+        start = metrics.clock()
+        doc = pipelines[language].make_doc(text)
+        metrics.observe_stage(language, "nlp", metrics.clock() - start)
+        return NlpArtifacts(
+            entities=[],
+            tokens=doc,
+            tokens_indices=[token.idx for token in doc],
+            lemmas=[token.lower_ for token in doc],
+            nlp_engine=engine.nlp_engine,
+            language=language,
+        )
+    return NlpArtifacts(
+        entities=[],
+        tokens=[],
+        tokens_indices=[],
+        lemmas=[],
+        nlp_engine=engine.nlp_engine,
+        language=language,
+    )
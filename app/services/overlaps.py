@@ -0,0 +1,133 @@
+import logging
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Union
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+OVERLAP_POLICIES = {"score", "length", "priority", "leftmost"}
+SMALL_INPUT = 2048
+
+
+def load_entity_priority(analyzer_config_path: Union[str, Path]) -> List[str]:
+    try:
+        with open(analyzer_config_path, encoding="utf-8") as f:
+            configuration = yaml.safe_load(f) or {}
+    except OSError as e:
+        logger.warning(f"Could not read entity_priority_list from {analyzer_config_path}: {str(e)}")
+        return []
+    return list(configuration.get("entity_priority_list") or [])
+
+
+class OverlapResolver:
+    # Keeps a non-overlapping subset of spans. Candidates are ranked by the
+    # policy and accepted greedily. Accepted spans are disjoint, so a
+    # candidate overlaps one iff an accepted span starts inside it or the
+    # last accepted span starting before it ends after its start; both are
+    # Fenwick tree queries over the candidates' start offsets, so each check
+    # is O(log n) and the whole pass, with its two sorts, O(n log n). Up to
+    # SMALL_INPUT candidates a plain sorted-list sweep is used instead: its
+    # inserts are O(n) but cheaper than the tree at that size.
+    def __init__(self, policy: str = "score", entity_priority: Optional[Sequence[str]] = None):
+        if policy not in OVERLAP_POLICIES:
+            raise ValueError(f"Unknown overlap policy '{policy}', expected one of {sorted(OVERLAP_POLICIES)}")
+        self.policy = policy
+        self.entity_priority = list(entity_priority or [])
+        self._rank = {entity: rank for rank, entity in enumerate(self.entity_priority)}
+        self._order = self._ordering()
+
+    def _ordering(self) -> Callable[[Any], tuple]:
+        unranked = len(self._rank)
+        rank = self._rank
+
+        if self.policy == "length":
+            return lambda r: (r.start - r.end, -r.score, rank.get(r.entity_type, unranked), r.start)
+        if self.policy == "priority":
+            return lambda r: (rank.get(r.entity_type, unranked), -r.score, r.start - r.end, r.start)
+        return lambda r: (-r.score, r.start - r.end, rank.get(r.entity_type, unranked), r.start)
+
+    def resolve(self, spans: Iterable[Any]) -> List[Any]:
+        if self.policy == "leftmost":
+            return self._leftmost(spans)
+
+        candidates = [span for span in spans if span.end > span.start]
+        if len(candidates) <= SMALL_INPUT:
+            return self._sweep(candidates)
+
+        starts = sorted({span.start for span in candidates})
+        rank = {start: pos for pos, start in enumerate(starts)}
+        taken = _StartCounts(len(starts))
+        ends = [0] * len(starts)
+        accepted: List[Any] = []
+        for span in sorted(candidates, key=self._order):
+            pos = rank[span.start]
+            before = taken.count(pos)
+            if taken.count(bisect_left(starts, span.end)) > before:
+                continue
+            if before and ends[taken.find(before)] > span.start:
+                continue
+            taken.add(pos)
+            ends[pos] = span.end
+            accepted.append(span)
+        accepted.sort(key=lambda span: span.start)
+        return accepted
+
+    def _sweep(self, candidates: List[Any]) -> List[Any]:
+        starts: List[int] = []
+        ends: List[int] = []
+        accepted: List[Any] = []
+        for span in sorted(candidates, key=self._order):
+            pos = bisect_right(starts, span.start)
+            if pos and ends[pos - 1] > span.start:
+                continue
+            if pos < len(starts) and starts[pos] < span.end:
+                continue
+            starts.insert(pos, span.start)
+            ends.insert(pos, span.end)
+            accepted.insert(pos, span)
+        return accepted
+
+    def _leftmost(self, spans: Iterable[Any]) -> List[Any]:
+        # The previous behaviour: first span to start wins, the higher score
+        # breaking ties.
+        accepted: List[Any] = []
+        cursor = 0
+        for span in sorted(spans, key=lambda r: (r.start, -r.score)):
+            if span.start < cursor or span.end <= span.start:
+                continue
+            accepted.append(span)
+            cursor = span.end
+        return accepted
+
+
+class _StartCounts:
+    # Fenwick tree over start offsets (by rank): marks accepted starts,
+    # counts them below a rank and finds the k-th one, each in O(log n).
+    def __init__(self, size: int):
+        self.tree = [0] * (size + 1)
+        self.top = 1 << size.bit_length() if size else 0
+
+    def add(self, pos: int) -> None:
+        pos += 1
+        while pos < len(self.tree):
+            self.tree[pos] += 1
+            pos += pos & -pos
+
+    def count(self, pos: int) -> int:
+        total = 0
+        while pos > 0:
+            total += self.tree[pos]
+            pos -= pos & -pos
+        return total
+
+    def find(self, k: int) -> int:
+        pos = 0
+        step = self.top
+        while step:
+            if pos + step < len(self.tree) and self.tree[pos + step] < k:
+                pos += step
+                k -= self.tree[pos]
+            step >>= 1
+        return pos
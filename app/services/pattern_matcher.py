@@ -0,0 +1,209 @@
+import logging
+import re
+import threading
+from collections import defaultdict
+from re import _constants as sre_constants
+from re import _parser as sre_parse
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+import regex
+
+from presidio_analyzer import AnalyzerEngine, EntityRecognizer, Pattern, PatternRecognizer, RecognizerResult
+from presidio_analyzer.pattern_recognizer import REGEX_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Requirement atom meaning "the text contains at least one digit".
+DIGIT = "\\d"
+
+# Syntax only the regex module understands; the stdlib parser would read it
+# as literals and derive bogus requirements.
+_REGEX_ONLY = re.compile(r"\[\[|\[:|\\[pPXmMGKLN]|\(\?V1|\(\?r|\(\?\||\{[eids]")
+
+_PARSE_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None)}
+
+
+def _is_digit_class(items) -> bool:
+    if not items:
+        return False
+    for op, av in items:
+        if op is sre_constants.LITERAL and chr(av).isdigit():
+            continue
+        if op is sre_constants.RANGE and "0" <= chr(av[0]) and chr(av[1]) <= "9":
+            continue
+        if op is sre_constants.CATEGORY and av is sre_constants.CATEGORY_DIGIT:
+            continue
+        return False
+    return True
+
+
+def _literal(code: int, ignorecase: bool) -> Set[str]:
+    char = chr(code)
+    # Under IGNORECASE a letter can match other case variants; only
+    # caseless characters are safe to require verbatim.
+    if ignorecase and char.lower() != char.upper():
+        return set()
+    return {char}
+
+
+def _required(items, ignorecase: bool) -> Set[str]:
+    required: Set[str] = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            required |= _literal(av, ignorecase)
+        elif op is sre_constants.IN:
+            if _is_digit_class(av):
+                required.add(DIGIT)
+            elif len(av) == 1 and av[0][0] is sre_constants.LITERAL:
+                required |= _literal(av[0][1], ignorecase)
+        elif op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            scoped = (ignorecase or bool(add_flags & re.IGNORECASE)) and not del_flags & re.IGNORECASE
+            required |= _required(sub, scoped)
+        elif op in _REPEATS:
+            low, _, sub = av
+            if low >= 1:
+                required |= _required(sub, ignorecase)
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            required |= _required(av, ignorecase)
+        elif op is sre_constants.BRANCH:
+            alternatives = [_required(branch, ignorecase) for branch in av[1]]
+            if alternatives:
+                required |= set.intersection(*alternatives)
+    return required
+
+
+def pattern_requirements(pattern: str, flags: int) -> FrozenSet[str]:
+    if _REGEX_ONLY.search(pattern):
+        return frozenset()
+    try:
+        parsed = sre_parse.parse(pattern, flags & _PARSE_FLAGS)
+    except (re.error, OverflowError, RecursionError):
+        # regex-module-only syntax: no prefilter, always scan.
+        return frozenset()
+    return frozenset(_required(parsed, bool(parsed.state.flags & re.IGNORECASE)))
+
+
+class _TextProfile:
+    __slots__ = ("text", "chars")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.chars: Set[str] = set(text)
+        if any(char.isdigit() for char in self.chars):
+            self.chars.add(DIGIT)
+
+
+class CompiledPatternMatcher:
+    def __init__(self, recognizers: List[PatternRecognizer]):
+        self.recognizers = recognizers
+        self.patterns: Dict[str, List[Tuple[Pattern, FrozenSet[str]]]] = {}
+        for recognizer in recognizers:
+            flags = recognizer.global_regex_flags or 0
+            self.patterns[recognizer.id] = []
+            for pattern in recognizer.patterns:
+                pattern.compiled_regex = regex.compile(pattern.regex, flags=flags)
+                pattern.compiled_with_flags = recognizer.global_regex_flags
+                self.patterns[recognizer.id].append((pattern, pattern_requirements(pattern.regex, flags)))
+        self._local = threading.local()
+
+    def _profile(self, text: str) -> _TextProfile:
+        profile = getattr(self._local, "profile", None)
+        if profile is None or profile.text is not text:
+            profile = _TextProfile(text)
+            self._local.profile = profile
+        return profile
+
+    def analyze(
+        self,
+        recognizer: PatternRecognizer,
+        text: str,
+        entities: List[str],
+        nlp_artifacts=None,
+        regex_flags: Optional[int] = None,
+    ) -> List[RecognizerResult]:
+        flags = recognizer.global_regex_flags
+        if regex_flags and regex_flags != flags:
+            return PatternRecognizer.analyze(recognizer, text, entities, nlp_artifacts, regex_flags)
+
+        chars = self._profile(text).chars
+        validations: Dict[str, Tuple[Optional[bool], Optional[bool]]] = {}
+        results = []
+        for pattern, required in self.patterns[recognizer.id]:
+            if not required <= chars:
+                continue
+            try:
+                for match in pattern.compiled_regex.finditer(text, timeout=REGEX_TIMEOUT_SECONDS):
+                    start, end = match.span()
+                    if start == end:
+                        continue
+                    result = self._score(recognizer, text[start:end], start, end, pattern, flags, validations)
+                    if result is not None:
+                        results.append(result)
+            except TimeoutError:
+                logger.warning(f"Regex pattern '{pattern.name}' timed out, skipping")
+        return EntityRecognizer.remove_duplicates(results)
+
+    @staticmethod
+    def _score(
+        recognizer: PatternRecognizer,
+        current_match: str,
+        start: int,
+        end: int,
+        pattern: Pattern,
+        flags: int,
+        validations: Dict[str, Tuple[Optional[bool], Optional[bool]]],
+    ) -> Optional[RecognizerResult]:
+        if current_match not in validations:
+            validations[current_match] = (
+                recognizer.validate_result(current_match),
+                recognizer.invalidate_result(current_match),
+            )
+        validation_result, invalidation_result = validations[current_match]
+
+        description = recognizer.build_regex_explanation(
+            recognizer.name, pattern.name, pattern.regex, pattern.score, validation_result, flags
+        )
+        result = RecognizerResult(
+            entity_type=recognizer.supported_entities[0],
+            start=start,
+            end=end,
+            score=pattern.score,
+            analysis_explanation=description,
+            recognition_metadata={
+                RecognizerResult.RECOGNIZER_NAME_KEY: recognizer.name,
+                RecognizerResult.RECOGNIZER_IDENTIFIER_KEY: recognizer.id,
+            },
+        )
+        if validation_result is not None:
+            result.score = EntityRecognizer.MAX_SCORE if validation_result else EntityRecognizer.MIN_SCORE
+        if invalidation_result:
+            result.score = EntityRecognizer.MIN_SCORE
+        description.score = result.score
+        return result if result.score > EntityRecognizer.MIN_SCORE else None
+
+
+def _dispatcher(matcher: CompiledPatternMatcher, recognizer: PatternRecognizer):
+    def analyze(text, entities, nlp_artifacts=None, regex_flags=None):
+        return matcher.analyze(recognizer, text, entities, nlp_artifacts, regex_flags)
+    return analyze
+
+
+def install_compiled_matcher(engine: AnalyzerEngine) -> Dict[str, CompiledPatternMatcher]:
+    by_language: Dict[str, List[PatternRecognizer]] = defaultdict(list)
+    for recognizer in engine.registry.recognizers:
+        # Subclasses that override analyze() do more than regex matching.
+        if type(recognizer).analyze is PatternRecognizer.analyze and recognizer.patterns:
+            by_language[recognizer.supported_language].append(recognizer)
+
+    matchers: Dict[str, CompiledPatternMatcher] = {}
+    for language, recognizers in by_language.items():
+        matcher = CompiledPatternMatcher(recognizers)
+        for recognizer in recognizers:
+            recognizer.analyze = _dispatcher(matcher, recognizer)
+        matchers[language] = matcher
+        filtered = sum(1 for patterns in matcher.patterns.values() for _, required in patterns if required)
+        total = sum(len(patterns) for patterns in matcher.patterns.values())
+        logger.info(f"Compiled pattern matcher for '{language}': {filtered}/{total} patterns prefiltered")
+    return matchers
@@ -0,0 +1,39 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def content_hash(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+# Recognizer sets registered through the API, kept in the server process and
+# referenced by their content hash. Oldest registrations are dropped first
+# once `max_sets` is reached; clients re-register on a 404.
+class RecognizerSets:
+    def __init__(self, max_sets: int):
+        self.max_sets = max_sets
+        self._sets: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, definition: Dict[str, Any]) -> str:
+        set_id = content_hash(definition)
+        with self._lock:
+            self._sets[set_id] = definition
+            self._sets.move_to_end(set_id)
+            while len(self._sets) > self.max_sets:
+                self._sets.popitem(last=False)
+        return set_id
+
+    def get(self, set_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            definition = self._sets.get(set_id)
+            if definition is not None:
+                self._sets.move_to_end(set_id)
+            return definition
+
+    def __len__(self) -> int:
+        return len(self._sets)
@@ -0,0 +1,24 @@
+from typing import Iterable, List
+
+from presidio_analyzer import RecognizerResult
+
+
+class Span:
+    # What the anonymize path keeps of a RecognizerResult. Presidio results
+    # carry a __dict__, an AnalysisExplanation and a metadata dict each; a
+    # batch holds every segment's results until placeholders are built, so
+    # they're converted right after analysis.
+    __slots__ = ("entity_type", "start", "end", "score")
+
+    def __init__(self, entity_type: str, start: int, end: int, score: float):
+        self.entity_type = entity_type
+        self.start = start
+        self.end = end
+        self.score = score
+
+    def __repr__(self) -> str:
+        return f"Span({self.entity_type!r}, {self.start}, {self.end}, {self.score})"
+
+
+def to_spans(results: Iterable[RecognizerResult], offset: int = 0) -> List[Span]:
+    return [Span(res.entity_type, res.start + offset, res.end + offset, res.score) for res in results]
@@ -0,0 +1,96 @@
+import importlib
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Imported explicitly during startup so their cost shows up in the profile
+# instead of being hidden inside the first service constructor.
+HEAVY_MODULES = ("spacy", "presidio_analyzer", "presidio_anonymizer")
+
+WARMUP_TEXTS = {
+    "en": "John Smith from London can be reached at john.smith@example.com or +1 212-555-0100.",
+    "ru": "Иван Петров из Москвы: ivan.petrov@example.com, +7 495 123-45-67.",
+    "xx": "Jean Dupont wohnt in Berlin, jean.dupont@example.com, +49 30 1234567.",
+}
+
+
+class StartupProfile:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phase = "starting"
+        self.ready = False
+        self.error: Optional[str] = None
+        self.total_seconds: Optional[float] = None
+        self.imports: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+        self.models: Dict[str, Optional[float]] = {}
+        self.warmup: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self.phase = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - start, 3)
+
+    def finish(self) -> None:
+        self.phase = "ready"
+        self.ready = True
+        self.total_seconds = round(time.perf_counter() - self.started_at, 3)
+        logger.info(
+            f"Startup complete in {self.total_seconds:.1f}s ("
+            + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.phases.items())
+            + ")"
+        )
+
+    def fail(self, error: Exception) -> None:
+        self.phase = "failed"
+        self.error = str(error)
+
+    @property
+    def failed(self) -> bool:
+        return self.phase == "failed"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "phase": self.phase,
+            "error": self.error,
+            "elapsed_seconds": self.total_seconds or round(time.perf_counter() - self.started_at, 3),
+            "phases": self.phases,
+            "imports": self.imports,
+            "models": self.models,
+            "warmup": self.warmup,
+        }
+
+
+def import_heavy_modules(profile: StartupProfile) -> None:
+    for name in HEAVY_MODULES:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        profile.imports[name] = round(time.perf_counter() - start, 3)
+        logger.info(f"Imported {name} in {profile.imports[name]:.2f}s")
+
+
+def ready_languages(services: Dict[str, Any]) -> List[str]:
+    return [
+        language for language, state in services["analyzer"].language_status().items()
+        if state["ready"]
+    ]
+
+
+def warm_up(services: Dict[str, Any], profile: StartupProfile) -> None:
+    # Only languages that are already loaded: warming an on-demand language
+    # would load it and defeat lazy loading.
+    translation_anonymizer = services["translation_anonymizer"]
+    for language in ready_languages(services):
+        text = WARMUP_TEXTS.get(language, WARMUP_TEXTS["en"])
+        start = time.perf_counter()
+        translation_anonymizer.analyze_and_anonymize(text, language)
+        profile.warmup[language] = round(time.perf_counter() - start, 3)
+        logger.info(f"Warm-up inference for '{language}' took {profile.warmup[language]:.2f}s")
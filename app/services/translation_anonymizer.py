@@ -1,60 +1,376 @@
 import logging
-from typing import Tuple, List, Dict, Any
+from collections import defaultdict
+from typing import Tuple, List, Dict, Any, Iterable, Iterator, NamedTuple, Optional, Sequence
 
 from presidio_analyzer import AnalyzerEngine
 from presidio_anonymizer import AnonymizerEngine
-from presidio_anonymizer.entities import OperatorConfig
+
+from app.services import metrics
+from app.services.cache import ResultCache
+from app.services.chunking import analyze_chunked
+from app.services.incremental import (
+    MAX_CHANGED_RATIO, assign_indices, carry_over, diff_blocks, expand_windows, make_revision,
+)
+from app.services.langid import AUTO, LanguageRouter, Run
+from app.services.nlp_profiles import tokenize_only, use_pattern_only
+from app.services.overlaps import OverlapResolver
+from app.services.spans import Span, to_spans
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the shape of cached results changes.
+RESULT_FORMAT = 3
+
+
+class Segment(NamedTuple):
+    text: str
+    language: str
+    entities: Optional[List[str]] = None
+    pattern_only: Optional[bool] = None
+
+
 class TranslationAnonymizerService:
-    def __init__(self, analyzer_engine: AnalyzerEngine, anonymizer_engine: AnonymizerEngine):
+    def __init__(
+        self,
+        analyzer_engine: AnalyzerEngine,
+        anonymizer_engine: AnonymizerEngine,
+        batch_size: int = 32,
+        n_process: int = 1,
+        cache: Optional[ResultCache] = None,
+        nlp_profile: str = "full",
+        chunk_threshold: int = 0,
+        chunk_size: int = 50_000,
+        chunk_overlap: int = 500,
+        overlap_resolver: Optional[OverlapResolver] = None,
+        language_router: Optional[LanguageRouter] = None,
+        context_sentences: int = 1,
+    ):
         self.analyzer = analyzer_engine
         self.anonymizer = anonymizer_engine
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.cache = cache
+        self.nlp_profile = nlp_profile
+        self.chunk_threshold = chunk_threshold
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.overlap_resolver = overlap_resolver or OverlapResolver()
+        # Without a router "auto" still resolves, to the fallback pipeline.
+        self.context_sentences = context_sentences
+        self.language_router = language_router or LanguageRouter(analyzer_engine.supported_languages, mode="off")
 
-    def analyze_and_anonymize(self, text: str, language: str) -> Tuple[str, List[Dict[str, Any]]]:
-        if not text or not language:
+    def analyze_and_anonymize(
+        self,
+        text: str,
+        language: str,
+        entities: Optional[List[str]] = None,
+        pattern_only: Optional[bool] = None,
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        if not text:
             return text, []
 
-        analyzer_results = self.analyzer.analyze(text=text, language=language)
-        if not analyzer_results:
-            return text, []
+        runs = self.language_router.route(text, language, whole=self._is_long(text))
+        if len(runs) > 1:
+            return self._analyze_and_anonymize_mixed(text, runs, entities, pattern_only)
+
+        language = runs[0].language
+        metrics.observe_text(language, len(text))
+        pattern_only = use_pattern_only(self.analyzer, language, entities, pattern_only, self.nlp_profile)
+        cache_key = self._cache_key(text, language, entities, pattern_only)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return tuple(cached)
+
+        if self._is_long(text):
+            analyzer_results = self._analyze_chunked(text, language, entities, pattern_only)
+        else:
+            nlp_artifacts = tokenize_only(self.analyzer, text, language) if pattern_only else None
+            analyzer_results = to_spans(self.analyzer.analyze(
+                text=text, language=language, entities=entities, nlp_artifacts=nlp_artifacts
+            ))
+        result = self._anonymize(text, language, analyzer_results)
+        if cache_key:
+            self.cache.set(cache_key, result)
+        return result
+
+    def _analyze_and_anonymize_mixed(
+        self,
+        text: str,
+        runs: List[Run],
+        entities: Optional[List[str]],
+        pattern_only: Optional[bool],
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        metrics.observe_text("mixed", len(text))
+        cache_key = self._cache_key(text, "mixed", entities, pattern_only, runs)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return tuple(cached)
+
+        analyzer_results: List[Span] = []
+        for run in runs:
+            run_pattern_only = use_pattern_only(self.analyzer, run.language, entities, pattern_only, self.nlp_profile)
+            run_text = text[run.start:run.end]
+            nlp_artifacts = tokenize_only(self.analyzer, run_text, run.language) if run_pattern_only else None
+            analyzer_results.extend(to_spans(
+                self.analyzer.analyze(
+                    text=run_text, language=run.language, entities=entities, nlp_artifacts=nlp_artifacts
+                ),
+                run.start,
+            ))
+        result = self._anonymize(text, "mixed", analyzer_results)
+        if cache_key:
+            self.cache.set(cache_key, result)
+        return result
+
+    def analyze_and_anonymize_revision(
+        self,
+        text: str,
+        language: Optional[str],
+        entities: Optional[List[str]] = None,
+        pattern_only: Optional[bool] = None,
+        previous: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any], float]:
+        # Like analyze_and_anonymize, but also returns a revision (text, raw
+        # spans, placeholder indices) to store, and the share of the text
+        # that was analyzed. Given the previous revision of the same segment,
+        # only the sentences around the edits are re-analyzed and placeholder
+        # indices stay stable. The result cache is bypassed: it doesn't keep
+        # raw spans.
+        if previous is not None and (not language or language == AUTO):
+            language = previous["language"]
+        else:
+            language = self.language_router.route(text, language, whole=True)[0].language
+        metrics.observe_text(language, len(text))
+        pattern_only = use_pattern_only(self.analyzer, language, entities, pattern_only, self.nlp_profile)
+        if previous is not None and (
+            previous["language"] != language
+            or previous["entities"] != (list(entities) if entities else None)
+            or previous["pattern_only"] != pattern_only
+        ):
+            previous = None
+
+        windows = [(0, len(text))]
+        raw_results: List[Span] = []
+        indices: Dict[Tuple[int, int, str], int] = {}
+        if previous is not None:
+            start = metrics.clock()
+            blocks, changed = diff_blocks(previous["text"], text)
+            windows = expand_windows(text, changed, self.context_sentences)
+            raw_results, windows, indices = carry_over(previous, blocks, windows)
+            metrics.observe_stage(language, "diff", metrics.clock() - start)
+            if sum(end - start for start, end in windows) > MAX_CHANGED_RATIO * len(text):
+                windows = [(0, len(text))]
+                raw_results = []
 
-        unique_spans: Dict[Tuple[int, int], Any] = {}
-        for res in sorted(analyzer_results, key=lambda r: (r.start, -r.score)):
-            key = (res.start, res.end)
-            if key not in unique_spans:
-                unique_spans[key] = res
+        if windows == [(0, len(text))]:
+            if self._is_long(text):
+                raw_results = self._analyze_chunked(text, language, entities, pattern_only)
+            elif text:
+                nlp_artifacts = tokenize_only(self.analyzer, text, language) if pattern_only else None
+                raw_results = to_spans(self.analyzer.analyze(
+                    text=text, language=language, entities=entities, nlp_artifacts=nlp_artifacts
+                ))
+        elif windows:
+            texts = [text[start:end] for start, end in windows]
+            for (start, _), window_results in zip(windows, self._analyze_batch(texts, language, entities, pattern_only)):
+                raw_results.extend(to_spans(window_results, start))
+        analyzed = sum(end - start for start, end in windows)
+        reanalyzed_ratio = analyzed / len(text) if text else 0.0
+        if previous is not None:
+            metrics.observe_reanalyzed(reanalyzed_ratio)
 
-        masked_results = list(unique_spans.values())
-        masked_results.sort(key=lambda r: r.start)
+        metrics.observe_entities(language, len(raw_results))
+        start = metrics.clock()
+        spans = self.overlap_resolver.resolve(raw_results)
+        placeholder_indices, next_index = assign_indices(text, spans, previous, indices)
+        anonymized_text, mappings = build_placeholders(text, spans, placeholder_indices)
+        metrics.observe_stage(language, "anonymize", metrics.clock() - start)
+        revision = make_revision(text, language, entities, pattern_only, raw_results, mappings, next_index)
+        return anonymized_text, mappings, revision, reanalyzed_ratio
 
-        operators = {
-            res.entity_type: OperatorConfig("replace", {"new_value": f"<{res.entity_type}>"})
-            for res in masked_results
-        }
+    def analyze_and_anonymize_batch(
+        self, items: List[Tuple]
+    ) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        segments = [Segment(*item) for item in items]
+        metrics.observe_batch(len(segments))
+        results: List[Tuple[str, List[Dict[str, Any]]]] = [None] * len(segments)
 
-        anon_result = self.anonymizer.anonymize(
-            text=text,
-            analyzer_results=masked_results,
-            operators=operators,
+        cache_keys: Dict[int, str] = {}
+        # Segments (or, for mixed-language segments, their per-language runs)
+        # are grouped by the language they were routed to, so each group goes
+        # through one nlp.pipe call. Entries are (idx, start, end).
+        groups: Dict[Tuple, List[Tuple[int, int, int]]] = defaultdict(list)
+        labels: Dict[int, str] = {}
+        long_items: List[Tuple[int, str, bool]] = []
+        # Repeated segments (headers, table cells, TM matches) are analyzed
+        # once and their result is shared by every later copy.
+        first_seen: Dict[Tuple, int] = {}
+        duplicates: List[Tuple[int, int]] = []
+        for idx, segment in enumerate(segments):
+            if not segment.text:
+                results[idx] = (segment.text, [])
+                continue
+            entities = tuple(segment.entities) if segment.entities else None
+            dedup_key = (segment.text, segment.language, entities, segment.pattern_only)
+            if dedup_key in first_seen:
+                duplicates.append((idx, first_seen[dedup_key]))
+                continue
+            first_seen[dedup_key] = idx
+
+            is_long = self._is_long(segment.text)
+            runs = self.language_router.route(segment.text, segment.language, whole=is_long)
+            if len(runs) == 1:
+                language = runs[0].language
+                pattern_only = use_pattern_only(
+                    self.analyzer, language, segment.entities, segment.pattern_only, self.nlp_profile
+                )
+                cache_key = self._cache_key(segment.text, language, entities, pattern_only)
+            else:
+                language = "mixed"
+                cache_key = self._cache_key(segment.text, language, entities, segment.pattern_only, runs)
+            metrics.observe_text(language, len(segment.text))
+            if cache_key:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    results[idx] = tuple(cached)
+                    continue
+                cache_keys[idx] = cache_key
+            if is_long:
+                long_items.append((idx, language, pattern_only))
+                continue
+            labels[idx] = language
+            for run in runs:
+                run_pattern_only = use_pattern_only(
+                    self.analyzer, run.language, segment.entities, segment.pattern_only, self.nlp_profile
+                )
+                groups[(run.language, entities, run_pattern_only)].append((idx, run.start, run.end))
+
+        analyzer_results: Dict[int, List[Span]] = defaultdict(list)
+        for (language, entities, pattern_only), entries in groups.items():
+            texts = [segments[idx].text[start:end] for idx, start, end in entries]
+            batch = self._analyze_batch(texts, language, list(entities) if entities else None, pattern_only)
+            for (idx, start, _), run_results in zip(entries, batch):
+                analyzer_results[idx].extend(to_spans(run_results, start))
+
+        for idx, language in labels.items():
+            results[idx] = self._anonymize(segments[idx].text, language, analyzer_results[idx])
+            if idx in cache_keys:
+                self.cache.set(cache_keys[idx], results[idx])
+
+        # Long documents are chunked on their own rather than batched with
+        # short segments, so one of them cannot pin a whole nlp.pipe batch.
+        for idx, language, pattern_only in long_items:
+            segment = segments[idx]
+            long_results = self._analyze_chunked(segment.text, language, segment.entities, pattern_only)
+            results[idx] = self._anonymize(segment.text, language, long_results)
+            if idx in cache_keys:
+                self.cache.set(cache_keys[idx], results[idx])
+
+        for idx, original in duplicates:
+            results[idx] = results[original]
+        if segments:
+            metrics.observe_dedup(len(duplicates) / len(segments))
+        return results
+
+    def _is_long(self, text: str) -> bool:
+        return bool(self.chunk_threshold) and len(text) > self.chunk_threshold
+
+    def _analyze_chunked(
+        self,
+        text: str,
+        language: str,
+        entities: Optional[List[str]] = None,
+        pattern_only: bool = False,
+    ) -> List[Span]:
+        return to_spans(analyze_chunked(
+            self.analyzer, text, language,
+            self.chunk_size, self.chunk_overlap,
+            batch_size=self.batch_size,
+            n_process=self.n_process,
+            pattern_only=pattern_only,
+            entities=list(entities) if entities else None,
+        ))
+
+    def _cache_key(
+        self,
+        text: str,
+        language: str,
+        entities: Optional[Iterable[str]],
+        pattern_only: Optional[bool],
+        runs: Optional[List[Run]] = None,
+    ) -> Optional[str]:
+        if not self.cache:
+            return None
+        return self.cache.key(
+            text, language, RESULT_FORMAT, tuple(entities) if entities else None, pattern_only,
+            self.overlap_resolver.policy, tuple(self.overlap_resolver.entity_priority),
+            *((tuple(runs),) if runs else ()),
         )
-        anonymized_text_generic = anon_result.text
 
-        mapping_list: List[Dict[str, Any]] = []
-        anonymized_text = anonymized_text_generic
-        for idx, res in enumerate(masked_results):
-            placeholder = f"<{res.entity_type}_{idx}>"
-            mapping_list.append({
-                "placeholder": placeholder,
-                "start": res.start,
-                "end": res.end,
-                "entity_type": res.entity_type,
-                "original": text[res.start:res.end],
-            })
+    def _analyze_batch(
+        self,
+        texts: List[str],
+        language: str,
+        entities: Optional[List[str]] = None,
+        pattern_only: bool = False,
+    ) -> Iterator[List[Span]]:
+        if pattern_only:
+            artifacts = (
+                (text, tokenize_only(self.analyzer, text, language)) for text in texts
+            )
+        else:
+            artifacts = self.analyzer.nlp_engine.process_batch(
+                texts, language, batch_size=self.batch_size, n_process=self.n_process
+            )
+        for text, (_, nlp_artifacts) in zip(texts, artifacts):
+            yield to_spans(self.analyzer.analyze(
+                text=text, language=language, entities=entities, nlp_artifacts=nlp_artifacts
+            ))
+
+    def _anonymize(
+        self, text: str, language: str, analyzer_results: List[Span]
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        metrics.observe_entities(language, len(analyzer_results))
+        if not analyzer_results:
+            return text, []
+
+        start = metrics.clock()
+        result = build_placeholders(text, self.overlap_resolver.resolve(analyzer_results))
+        metrics.observe_stage(language, "anonymize", metrics.clock() - start)
+        return result
+
 
-            generic = f"<{res.entity_type}>"
-            anonymized_text = anonymized_text.replace(generic, placeholder, 1)
+def build_placeholders(
+    text: str, spans: Iterable[Span], indices: Optional[Sequence[int]] = None
+) -> Tuple[str, List[Dict[str, Any]]]:
+    # `indices` (aligned with `spans`) overrides the running placeholder
+    # number, e.g. to keep the numbering of a previous revision.
+    parts: List[str] = []
+    mapping_list: List[Dict[str, Any]] = []
+    cursor = 0
+    offset = 0
+    for pos, res in enumerate(spans):
+        if res.start < cursor:
+            continue
 
-        return anonymized_text, mapping_list
+        index = indices[pos] if indices is not None else len(mapping_list)
+        placeholder = f"<{res.entity_type}_{index}>"
+        parts.append(text[cursor:res.start])
+        parts.append(placeholder)
+        offset += res.start - cursor
+        mapping_list.append({
+            "placeholder": placeholder,
+            "start": res.start,
+            "end": res.end,
+            "entity_type": res.entity_type,
+            "original": text[res.start:res.end],
+            "placeholder_start": offset,
+            "placeholder_end": offset + len(placeholder),
+        })
+        offset += len(placeholder)
+        cursor = res.end
 
+    parts.append(text[cursor:])
+    return "".join(parts), mapping_list
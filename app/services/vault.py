@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.cache import SqliteCacheBackend
+
+logger = logging.getLogger(__name__)
+
+# Matches any placeholder build_placeholders() can emit, e.g. <PERSON_0>.
+PLACEHOLDER_RE = re.compile(r"<[A-Z0-9_]+_\d+>")
+
+VAULT_FINGERPRINT = "vault"
+REVISION_SUFFIX = ".revision"
+
+
+def restore_text(text: str, originals: Dict[str, str]) -> Tuple[str, int, List[str]]:
+    # One regex pass over the text with a dict lookup per placeholder, instead
+    # of one str.replace per mapping. Placeholders the vault doesn't know are
+    # left untouched.
+    seen = set()
+    restored = 0
+
+    def substitute(match: "re.Match") -> str:
+        nonlocal restored
+        placeholder = match.group(0)
+        original = originals.get(placeholder)
+        if original is None:
+            return placeholder
+        restored += 1
+        seen.add(placeholder)
+        return original
+
+    restored_text = PLACEHOLDER_RE.sub(substitute, text)
+    missing = [placeholder for placeholder in originals if placeholder not in seen]
+    return restored_text, restored, missing
+
+
+# Placeholder -> original mappings kept on the server so clients only carry an
+# opaque id through translation. Entries expire after `ttl_seconds`; when the
+# in-memory store exceeds `max_bytes` the oldest entries are dropped first. The
+# optional SQLite backend keeps them across restarts and server processes.
+# Calls may block on SQLite: run them off the event loop.
+class MappingVault:
+    def __init__(self, max_bytes: int, ttl_seconds: float, backend: Optional[SqliteCacheBackend] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+
+        self.stored = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, mappings: List[Dict[str, Any]]) -> str:
+        return self.put_many([mappings])[0]
+
+    def put_many(self, batch: List[List[Dict[str, Any]]]) -> List[str]:
+        # One id per mappings list; the backend writes them in one transaction.
+        mapping_ids = [secrets.token_urlsafe(16) for _ in batch]
+        self._put_many([
+            (mapping_id, {mapping["placeholder"]: mapping["original"] for mapping in mappings})
+            for mapping_id, mappings in zip(mapping_ids, batch)
+        ])
+        with self._lock:
+            self.stored += len(batch)
+        return mapping_ids
+
+    def get(self, mapping_id: str) -> Optional[Dict[str, str]]:
+        if mapping_id.endswith(REVISION_SUFFIX):
+            return None
+        return self._get(mapping_id)
+
+    # Revisions (text, raw spans and placeholder indices) are stored next to
+    # a mapping so a later edit of the same segment can be re-analyzed
+    # incrementally. They share the mapping's TTL and size budget.
+    def put_revision(self, mapping_id: str, revision: Dict[str, Any]) -> None:
+        self._put_many([(f"{mapping_id}{REVISION_SUFFIX}", revision)])
+
+    def get_revision(self, mapping_id: str) -> Optional[Dict[str, Any]]:
+        return self._get(f"{mapping_id}{REVISION_SUFFIX}")
+
+    def delete(self, mapping_id: str) -> None:
+        self.delete_many([mapping_id])
+
+    def delete_many(self, mapping_ids: List[str]) -> None:
+        keys = [key for mapping_id in mapping_ids for key in (mapping_id, f"{mapping_id}{REVISION_SUFFIX}")]
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+        if self.backend:
+            self.backend.delete_many(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stored": self.stored,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "backend": self.backend.path if self.backend else None,
+        }
+
+    def _put_many(self, items: List[Tuple[str, Any]]) -> None:
+        payloads = [(key, json.dumps(value, ensure_ascii=False, separators=(",", ":"))) for key, value in items]
+        now = time.monotonic()
+        with self._lock:
+            for key, payload in payloads:
+                self._store(key, payload, now)
+        if self.backend:
+            self.backend.set_many(payloads, VAULT_FINGERPRINT, self.ttl_seconds)
+
+    def _get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < now:
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self.hits += 1
+                return json.loads(entry[1])
+
+        payload = self.backend.get(key) if self.backend else None
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(payload)
+
+    def _store(self, mapping_id: str, payload: str, now: float) -> None:
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        self._entries[mapping_id] = (now + self.ttl_seconds, payload)
+        self.size_bytes += size
+        # TTL is fixed, so insertion order is also expiry order.
+        while self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, mapping_id: str) -> None:
+        _, payload = self._entries.pop(mapping_id)
+        self.size_bytes -= len(payload)
+
+
+def create_mapping_vault(settings) -> Optional[MappingVault]:
+    if not settings.vault_enabled:
+        return None
+
+    backend = None
+    if settings.vault_backend == "sqlite":
+        os.makedirs(os.path.dirname(settings.vault_sqlite_path) or ".", exist_ok=True)
+        backend = SqliteCacheBackend(settings.vault_sqlite_path, settings.vault_sqlite_max_bytes)
+    logger.info(f"Mapping vault enabled ({settings.vault_backend}, ttl {settings.vault_ttl_seconds}s)")
+    return MappingVault(
+        max_bytes=settings.vault_max_bytes,
+        ttl_seconds=settings.vault_ttl_seconds,
+        backend=backend,
+    )
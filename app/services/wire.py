@@ -0,0 +1,140 @@
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List, Literal, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = {MSGPACK, "application/x-msgpack"}
+
+Layout = Literal["rows", "columnar"]
+
+
+def dump_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def negotiate(accept: Optional[str]) -> str:
+    # Picks the highest-q media range we can produce; JSON unless the client
+    # asks for MessagePack. 406 when only MessagePack is acceptable and the
+    # msgpack package isn't installed.
+    if not accept:
+        return JSON
+    ranges = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranges.append((-q, position, media_type.lower()))
+
+    for _, _, media_type in sorted(ranges):
+        if media_type in MSGPACK_TYPES and msgpack is not None:
+            return MSGPACK
+        if media_type in {JSON, "application/*", "*/*"}:
+            return JSON
+    if any(media_type in MSGPACK_TYPES for _, _, media_type in ranges):
+        raise HTTPException(status_code=406, detail="MessagePack responses need the msgpack package")
+    return JSON
+
+
+def render(request: Request, content: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    # Encodes plain dicts/lists directly, skipping response_model validation.
+    media_type = negotiate(request.headers.get("accept"))
+    if media_type == MSGPACK:
+        body = msgpack.packb(content, use_bin_type=True)
+    else:
+        body = dump_json(content)
+    response = Response(content=body, media_type=media_type, headers=headers)
+    response.headers["Vary"] = "Accept"
+    return response
+
+
+async def iter_lines(request: Request, max_line_bytes: int = 0) -> AsyncIterator[bytes]:
+    # A line longer than `max_line_bytes` (0: no limit) raises 413 instead of
+    # growing the buffer without bound.
+    buffer = bytearray()
+    async for chunk in request.stream():
+        buffer.extend(chunk)
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                break
+            if max_line_bytes and end - start > max_line_bytes:
+                raise HTTPException(status_code=413, detail=f"Line exceeds the {max_line_bytes}-byte limit")
+            yield bytes(buffer[start:end])
+            start = end + 1
+        del buffer[:start]
+        if max_line_bytes and len(buffer) > max_line_bytes:
+            raise HTTPException(status_code=413, detail=f"Line exceeds the {max_line_bytes}-byte limit")
+    if buffer:
+        yield bytes(buffer)
+
+
+def _type_index(types: Dict[str, int], entity_type: str) -> int:
+    index = types.get(entity_type)
+    if index is None:
+        index = types[entity_type] = len(types)
+    return index
+
+
+# Columnar layouts: one parallel array per field, entity types interned into a
+# lookup table. Segment i owns mappings offsets[i]:offsets[i + 1]; the
+# placeholder of mapping k in a segment is "<{type}_{k}>", except for
+# incremental results, whose numbering follows the previous revision (slice
+# it out of the text with placeholder_start/placeholder_end).
+def columnar_translation(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    types: Dict[str, int] = {}
+    offsets = [0]
+    columns: Dict[str, List[Any]] = {
+        "start": [], "end": [], "type": [], "original": [], "placeholder_start": [], "placeholder_end": [],
+    }
+    for result in results:
+        for mapping in result["mappings"]:
+            columns["start"].append(mapping["start"])
+            columns["end"].append(mapping["end"])
+            columns["type"].append(_type_index(types, mapping["entity_type"]))
+            columns["original"].append(mapping["original"])
+            columns["placeholder_start"].append(mapping["placeholder_start"])
+            columns["placeholder_end"].append(mapping["placeholder_end"])
+        offsets.append(len(columns["start"]))
+
+    content = {
+        "anonymized_text": [result["anonymized_text"] for result in results],
+        "entity_types": list(types),
+        "mappings": {"offsets": offsets, **columns},
+    }
+    if results and "mapping_id" in results[0]:
+        content["mapping_id"] = [result.get("mapping_id") for result in results]
+    return content
+
+
+def columnar_entities(entities: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    types: Dict[str, int] = {}
+    columns: Dict[str, List[Any]] = {"start": [], "end": [], "type": [], "score": [], "recognizer_name": []}
+    for entity in entities:
+        columns["start"].append(entity["start"])
+        columns["end"].append(entity["end"])
+        columns["type"].append(_type_index(types, entity["entity_type"]))
+        columns["score"].append(entity["score"])
+        columns["recognizer_name"].append(entity["recognizer_name"])
+    return {"entity_types": list(types), **columns}
@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.models.analysis import AnalyzeRequest
+from app.models.anonymization import AnonymizeRequest, DeanonymizeRequest
+from app.services.limits import check_text
+
+logger = logging.getLogger(__name__)
+
+_services: Dict[str, Any] = {}
+
+
+def load_services(settings=None) -> Dict[str, Any]:
+    from app.services.analyzer import AnalyzerService
+    from app.services.anonymizer import AnonymizerService
+    from app.services.cache import create_result_cache
+    from app.services.langid import create_language_router
+    from app.services.overlaps import OverlapResolver
+    from app.services.translation_anonymizer import TranslationAnonymizerService
+
+    settings = settings or get_settings()
+
+    logger.info("Pre-loading analyzer engine...")
+    analyzer = AnalyzerService(settings)
+    logger.info("Analyzer engine loaded successfully")
+
+    logger.info("Pre-loading anonymizer engine...")
+    anonymizer = AnonymizerService()
+    logger.info("Anonymizer engine loaded successfully")
+
+    logger.info("Pre-loading translation anonymizer service...")
+    translation_anonymizer = TranslationAnonymizerService(
+        analyzer_engine=analyzer.engine,
+        anonymizer_engine=anonymizer.anonymizer,
+        batch_size=settings.nlp_batch_size,
+        n_process=settings.nlp_n_process,
+        cache=create_result_cache(settings),
+        nlp_profile=settings.nlp_profile,
+        chunk_threshold=settings.chunk_threshold,
+        chunk_size=settings.chunk_size,
+        chunk_overlap=settings.chunk_overlap,
+        overlap_resolver=OverlapResolver(settings.overlap_policy, analyzer.entity_priority),
+        language_router=create_language_router(settings, analyzer.engine.supported_languages),
+        context_sentences=settings.incremental_context_sentences,
+    )
+    logger.info("Translation anonymizer loaded successfully")
+
+    return {
+        "analyzer": analyzer,
+        "anonymizer": anonymizer,
+        "translation_anonymizer": translation_anonymizer,
+    }
+
+
+def register_services(services: Dict[str, Any]) -> None:
+    _services.update(services)
+
+
+def init_worker() -> None:
+    if not _services:
+        register_services(load_services())
+
+
+def analyze(req: AnalyzeRequest) -> List[Dict[str, Any]]:
+    return _services["analyzer"].analyze(req)
+
+
+def anonymize(req: AnonymizeRequest) -> Dict[str, Any]:
+    return _services["anonymizer"].anonymize(req)
+
+
+def deanonymize(req: DeanonymizeRequest) -> Dict[str, Any]:
+    return _services["anonymizer"].deanonymize(req)
+
+
+def check_recognizer_set(
+    ad_hoc_recognizers: List[Dict[str, Any]], allow_list: Optional[List[str]], allow_list_match: Optional[str]
+) -> None:
+    # Compiling through the worker's cache also warms it for the set's first use.
+    cache = _services["analyzer"].ad_hoc_cache
+    cache.recognizers(ad_hoc_recognizers)
+    if allow_list:
+        cache.allow_list(allow_list, allow_list_match or "exact")
+
+
+def ad_hoc_stats() -> Dict[str, Any]:
+    return _services["analyzer"].ad_hoc_stats()
+
+
+def sample(fn: Callable[[], Any]) -> Tuple[int, Any]:
+    return os.getpid(), fn()
+
+
+def cache_stats() -> Dict[str, Any]:
+    cache = _services["translation_anonymizer"].cache
+    return cache.stats() if cache else {}
+
+
+def language_status() -> Dict[str, Any]:
+    return _services["analyzer"].language_status()
+
+
+def translation_anonymize(
+    text: str,
+    language: str,
+    entities: Optional[List[str]] = None,
+    pattern_only: Optional[bool] = None,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    return _services["translation_anonymizer"].analyze_and_anonymize(text, language, entities, pattern_only)
+
+
+def translation_anonymize_revision(
+    text: str,
+    language: str,
+    entities: Optional[List[str]] = None,
+    pattern_only: Optional[bool] = None,
+    previous: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any], float]:
+    return _services["translation_anonymizer"].analyze_and_anonymize_revision(
+        text, language, entities, pattern_only, previous
+    )
+
+
+def translation_anonymize_batch(items: List[Tuple]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    return _services["translation_anonymizer"].analyze_and_anonymize_batch(items)
+
+
+def _parse_line(line: bytes, fmt: str, language: str) -> Tuple:
+    if fmt == "text":
+        return check_text(line.decode("utf-8").rstrip("\r")), language
+    record = json.loads(line)
+    return check_text(record["text"]), record.get("language") or language, record.get("entities"), record.get("pattern_only")
+
+
+def translation_anonymize_lines(lines: List[bytes], fmt: str, language: str) -> List[bytes]:
+    # Raw JSONL/text lines in, one JSONL result record per line out. Bad lines
+    # get an error record instead of failing the whole chunk.
+    items: List[Tuple] = []
+    errors: Dict[int, str] = {}
+    for idx, line in enumerate(lines):
+        if not line.strip():
+            items.append(("", language))
+            continue
+        try:
+            items.append(_parse_line(line, fmt, language))
+        except (ValueError, KeyError, TypeError) as e:
+            errors[idx] = f"Invalid input line: {str(e)}"
+            items.append(("", language))
+
+    try:
+        results = translation_anonymize_batch(items)
+    except Exception as e:
+        logger.error(f"Anonymizing a chunk of {len(lines)} lines failed: {str(e)}")
+        results = None
+        errors = {idx: str(e) for idx in range(len(lines))}
+
+    output = []
+    for idx in range(len(lines)):
+        if idx in errors:
+            record: Dict[str, Any] = {"error": errors[idx]}
+        else:
+            anonymized_text, mappings = results[idx]
+            record = {"anonymized_text": anonymized_text, "mappings": mappings}
+        output.append(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+    return output
@@ -0,0 +1,49 @@
+import argparse
+import json
+import time
+
+from app.config import get_settings
+from app.services.analyzer import AnalyzerService
+from app.services.anonymizer import AnonymizerService
+from app.services.translation_anonymizer import TranslationAnonymizerService
+from benchmarks.corpus import make_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-item loop vs batched analysis for /anonymize/batch")
+    parser.add_argument("--segments", type=int, default=2000, help="Number of segments")
+    parser.add_argument("--batch-size", type=int, default=get_settings().nlp_batch_size, help="nlp.pipe batch size")
+    parser.add_argument("--n-process", type=int, default=1, help="nlp.pipe worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    args = parser.parse_args()
+
+    service = TranslationAnonymizerService(
+        analyzer_engine=AnalyzerService(get_settings()).engine,
+        anonymizer_engine=AnonymizerService().anonymizer,
+        batch_size=args.batch_size,
+        n_process=args.n_process,
+    )
+    corpus = make_corpus(args.segments, seed=args.seed)
+    service.analyze_and_anonymize_batch(corpus[:50])
+
+    start = time.perf_counter()
+    for text, language in corpus:
+        service.analyze_and_anonymize(text, language)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    service.analyze_and_anonymize_batch(corpus)
+    batch_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "segments": len(corpus),
+        "batch_size": args.batch_size,
+        "n_process": args.n_process,
+        "loop_segments_per_sec": round(len(corpus) / loop_seconds, 1),
+        "batch_segments_per_sec": round(len(corpus) / batch_seconds, 1),
+        "speedup": round(loop_seconds / batch_seconds, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import json
+import multiprocessing
+import random
+import resource
+import time
+
+from app.config import get_settings
+from app.services.analyzer import AnalyzerService
+from app.services.chunking import analyze_chunked, split_chunks
+from app.services.memory import process_memory
+from benchmarks.corpus import make_document
+
+_engine = None
+
+
+def _signature(results):
+    return sorted((r.entity_type, r.start, r.end, round(r.score, 4)) for r in results)
+
+
+def _run(case):
+    mode, text, language, chunk_size, overlap, n_process = case
+    baseline = process_memory().get("rss", 0)
+    start = time.perf_counter()
+    if mode == "whole":
+        nlp = _engine.nlp_engine.nlp[language]
+        nlp.max_length = max(nlp.max_length, len(text) + 1)
+        results = _engine.analyze(text=text, language=language)
+    else:
+        results = analyze_chunked(_engine, text, language, chunk_size, overlap, n_process=n_process)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux; each case runs in a fresh forked child.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {
+        "seconds": round(elapsed, 2),
+        "peak_rss_delta_mb": round(max(peak - baseline, 0) / 2**20, 1),
+        "entities": len(results),
+        "signature": _signature(results),
+    }
+
+
+def _measure(case):
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(1, maxtasksperchild=1) as pool:
+        return pool.apply(_run, (case,))
+
+
+def main():
+    global _engine
+    parser = argparse.ArgumentParser(description="Whole-document vs chunked analysis of long documents: latency and peak memory")
+    parser.add_argument("--language", type=str, default="en", help="Document language")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000], help="Document sizes in bytes")
+    parser.add_argument("--whole-limit", type=int, default=1_000_000, help="Skip whole-document analysis above this size")
+    parser.add_argument("--n-process", type=int, default=1, help="nlp.pipe processes used for chunks")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    _engine = AnalyzerService(settings).engine
+
+    report = []
+    for size in args.sizes:
+        text = make_document(random.Random(size), args.language, size)
+        chunked = _measure(("chunked", text, args.language, settings.chunk_size, settings.chunk_overlap, args.n_process))
+        row = {
+            "size_bytes": size,
+            "chunks": len(split_chunks(text, settings.chunk_size, settings.chunk_overlap)),
+            "chunked": {k: v for k, v in chunked.items() if k != "signature"},
+        }
+        if size <= args.whole_limit:
+            whole = _measure(("whole", text, args.language, 0, 0, 1))
+            row["whole"] = {k: v for k, v in whole.items() if k != "signature"}
+            row["identical"] = whole["signature"] == chunked["signature"]
+            row["speedup"] = round(whole["seconds"] / max(chunked["seconds"], 1e-9), 2)
+        report.append(row)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
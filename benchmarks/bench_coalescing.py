@@ -0,0 +1,51 @@
+import argparse
+import os
+import subprocess
+import sys
+from urllib.parse import urlsplit
+
+from benchmarks.corpus import make_corpus
+from benchmarks.loadtest import _run_endpoint, _single, _wait_ready
+from benchmarks.stats import metadata, write_report
+
+MODES = {"direct": "false", "coalesced": "true"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-segment /anonymize throughput and latency: direct vs coalesced")
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8000", help="Base URL the app is started on")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256], help="Concurrent clients")
+    parser.add_argument("--requests-per-client", type=int, default=50, help="Requests per client at each level")
+    parser.add_argument("--min-requests", type=int, default=500, help="Lower bound on requests per level")
+    parser.add_argument("--segments", type=int, default=2000, help="Corpus size")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--output", type=str, default=None, help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.segments, seed=args.seed)
+    port = urlsplit(args.url).port or 8000
+    results = {}
+    for mode, enabled in MODES.items():
+        # A fresh server per mode, with the result cache off so repeated
+        # corpus segments are analyzed every time.
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app.main", "--host", "127.0.0.1", "--port", str(port)],
+            env=dict(os.environ, LOG_LEVEL="WARNING", COALESCE_ENABLED=enabled, CACHE_ENABLED="false"),
+        )
+        try:
+            _wait_ready(args.url, timeout=300)
+            for concurrency in args.concurrency:
+                requests = max(concurrency * args.requests_per_client, args.min_requests)
+                _run_endpoint(args.url, lambda i: _single(corpus, i), concurrency * 2, concurrency)
+                results[f"http.single.{mode}/c{concurrency}"] = _run_endpoint(
+                    args.url, lambda i: _single(corpus, i), requests, concurrency
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+    write_report({"meta": metadata(vars(args)), "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import json
+import random
+import time
+
+from app.config import get_settings
+from app.services.analyzer import AnalyzerService
+from app.services.anonymizer import AnonymizerService
+from app.services.translation_anonymizer import TranslationAnonymizerService
+from benchmarks.corpus import make_segment
+
+EDITS = {
+    "insert": lambda rng, text, pos: text[:pos] + "lorem " + text[pos:],
+    "delete": lambda rng, text, pos: text[:pos] + text[pos + rng.randint(1, 20):],
+    "add_pii": lambda rng, text, pos: text[:pos] + " Contact Mary Johnson at mary@example.com. " + text[pos:],
+}
+
+
+def spans(mappings):
+    return [(mapping["start"], mapping["end"], mapping["entity_type"]) for mapping in mappings]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs incremental re-analysis of an edited document")
+    parser.add_argument("--segments", type=int, default=400, help="Corpus segments joined into the document")
+    parser.add_argument("--edits", type=int, default=20, help="Successive random edits")
+    parser.add_argument("--language", type=str, default="en", help="Document language")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and edit seed")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    service = TranslationAnonymizerService(
+        analyzer_engine=AnalyzerService(settings).engine,
+        anonymizer_engine=AnonymizerService().anonymizer,
+        context_sentences=settings.incremental_context_sentences,
+    )
+    rng = random.Random(args.seed)
+    text = " ".join(make_segment(rng, args.language, 3) for _ in range(args.segments))
+    _, mappings, revision, _ = service.analyze_and_anonymize_revision(text, args.language)
+
+    full_seconds = incremental_seconds = 0.0
+    ratios, mismatches, stable, carried = [], 0, 0, 0
+    for _ in range(args.edits):
+        edited = EDITS[rng.choice(list(EDITS))](rng, text, rng.randrange(len(text)))
+
+        start = time.perf_counter()
+        _, full_mappings, _, _ = service.analyze_and_anonymize_revision(edited, args.language)
+        full_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, new_mappings, new_revision, ratio = service.analyze_and_anonymize_revision(
+            edited, args.language, previous=revision
+        )
+        incremental_seconds += time.perf_counter() - start
+
+        ratios.append(ratio)
+        mismatches += spans(new_mappings) != spans(full_mappings)
+        previous = {(mapping["original"], mapping["placeholder"]) for mapping in mappings}
+        stable += sum((mapping["original"], mapping["placeholder"]) in previous for mapping in new_mappings)
+        carried += len(new_mappings)
+        text, mappings, revision = edited, new_mappings, new_revision
+
+    print(json.dumps({
+        "document_chars": len(text),
+        "edits": args.edits,
+        "full_ms_per_edit": round(full_seconds / args.edits * 1000, 1),
+        "incremental_ms_per_edit": round(incremental_seconds / args.edits * 1000, 1),
+        "speedup": round(full_seconds / incremental_seconds, 1),
+        "mean_reanalyzed_ratio": round(sum(ratios) / len(ratios), 4),
+        "span_mismatches_vs_full": mismatches,
+        "stable_placeholder_share": round(stable / carried, 4) if carried else 1.0,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
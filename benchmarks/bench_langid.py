@@ -0,0 +1,80 @@
+import argparse
+import json
+import random
+import time
+
+from app.config import get_settings
+from app.services.analyzer import AnalyzerService
+from app.services.anonymizer import AnonymizerService
+from app.services.langid import LanguageRouter
+from app.services.translation_anonymizer import TranslationAnonymizerService
+from benchmarks.corpus import FILLER, make_corpus
+
+# The "xx" fillers are one sentence each in these languages, in order.
+XX_FILLER_LANGUAGES = ("fr", "de", "it", "es")
+
+
+def labelled_sentences():
+    for language in ("en", "ru"):
+        for sentence in FILLER[language]:
+            yield sentence, language
+    yield from zip(FILLER["xx"], XX_FILLER_LANGUAGES)
+
+
+def mixed_segments(size: int, seed: int):
+    rng = random.Random(seed)
+    for _ in range(size):
+        first, second = rng.sample(["en", "ru"], 2)
+        yield f"{rng.choice(FILLER[first])} {rng.choice(FILLER[second])}", [first, second]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Language identification: accuracy, mixed-segment routing and overhead vs NER")
+    parser.add_argument("--segments", type=int, default=2000, help="Number of corpus segments")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    args = parser.parse_args()
+
+    analyzer = AnalyzerService(get_settings()).engine
+    router = LanguageRouter(analyzer.supported_languages)
+    identifier = router.identifier
+
+    sentences = list(labelled_sentences())
+    detected = [identifier.detect(sentence)[0] for sentence, _ in sentences]
+    mixed = list(mixed_segments(args.segments // 10 or 1, args.seed))
+    mixed_routed = [
+        [run.language for run in router.route(text, "auto")] == [lang if lang in router.supported else router.fallback for lang in languages]
+        for text, languages in mixed
+    ]
+
+    corpus = make_corpus(args.segments, seed=args.seed)
+    start = time.perf_counter()
+    for text, _ in corpus:
+        router.route(text, "auto")
+    routing_seconds = time.perf_counter() - start
+
+    explicit = TranslationAnonymizerService(analyzer, AnonymizerService().anonymizer)
+    auto = TranslationAnonymizerService(analyzer, AnonymizerService().anonymizer, language_router=router)
+    explicit.analyze_and_anonymize_batch(corpus[:50])
+
+    start = time.perf_counter()
+    explicit.analyze_and_anonymize_batch(corpus)
+    explicit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    auto.analyze_and_anonymize_batch([(text, "auto") for text, _ in corpus])
+    auto_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "segments": len(corpus),
+        "sentence_accuracy": round(sum(d == lang for d, (_, lang) in zip(detected, sentences)) / len(sentences), 3),
+        "sentence_undetected": sum(d is None for d in detected),
+        "mixed_segments_routed": round(sum(mixed_routed) / len(mixed_routed), 3),
+        "routing_us_per_segment": round(routing_seconds / len(corpus) * 1e6, 1),
+        "explicit_segments_per_sec": round(len(corpus) / explicit_seconds, 1),
+        "auto_segments_per_sec": round(len(corpus) / auto_seconds, 1),
+        "routing_share_of_auto": round(routing_seconds / auto_seconds, 4),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
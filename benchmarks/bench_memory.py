@@ -0,0 +1,91 @@
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+from benchmarks.corpus import make_corpus
+from benchmarks.stats import metadata, write_report
+
+
+def _kib_to_mb(kib: int) -> float:
+    return round(kib / 1024, 1)
+
+
+def profile(segments: int, seed: int, max_sentences: int) -> dict:
+    # Runs in a fresh interpreter so ru_maxrss only covers this case.
+    from app.config import get_settings
+    from app.services import wire
+    from app.services.analyzer import AnalyzerService
+    from app.services.anonymizer import AnonymizerService
+    from app.services.translation_anonymizer import TranslationAnonymizerService
+
+    service = TranslationAnonymizerService(
+        analyzer_engine=AnalyzerService(get_settings()).engine,
+        anonymizer_engine=AnonymizerService().anonymizer,
+    )
+    corpus = make_corpus(segments, max_sentences=max_sentences, seed=seed)
+    service.analyze_and_anonymize_batch(corpus[:50])
+    gc.collect()
+
+    # RSS on an untraced pass: tracemalloc's own bookkeeping would dwarf it.
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results = service.analyze_and_anonymize_batch(corpus)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    del results
+    gc.collect()
+
+    tracemalloc.start()
+    results = service.analyze_and_anonymize_batch(corpus)
+    analysis_peak = tracemalloc.get_traced_memory()[1]
+    retained = tracemalloc.take_snapshot().statistics("filename")
+    tracemalloc.reset_peak()
+    body = wire.dump_json([
+        {"anonymized_text": anonymized_text, "mappings": mappings} for anonymized_text, mappings in results
+    ])
+    render_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "segments": segments,
+        "mappings": sum(len(mappings) for _, mappings in results),
+        "response_mb": round(len(body) / 1024 / 1024, 1),
+        "peak_rss_mb": _kib_to_mb(peak_rss),
+        "peak_rss_growth_mb": _kib_to_mb(peak_rss - baseline_rss),
+        "analysis_peak_traced_mb": round(analysis_peak / 1024 / 1024, 1),
+        "analysis_peak_bytes_per_segment": round(analysis_peak / segments),
+        "retained_blocks_per_segment": round(sum(stat.count for stat in retained) / segments, 1),
+        "retained_bytes_per_segment": round(sum(stat.size for stat in retained) / segments),
+        "render_peak_traced_mb": round(render_peak / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS and allocations per segment for large /anonymize/batch workloads")
+    parser.add_argument("--segments", type=int, nargs="+", default=[10_000, 50_000], help="Batch sizes to profile")
+    parser.add_argument("--max-sentences", type=int, default=3, help="Max sentences per segment")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--case", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--output", type=str, default=None, help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.case is not None:
+        print(json.dumps(profile(args.case, args.seed, args.max_sentences)))
+        return
+
+    results = {}
+    for segments in args.segments:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_memory", "--case", str(segments),
+             "--seed", str(args.seed), "--max-sentences", str(args.max_sentences)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        results[f"memory.batch/{segments}"] = json.loads(output.strip().splitlines()[-1])
+
+    write_report({"meta": metadata(vars(args)), "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import json
+import random
+import time
+
+from presidio_analyzer import PatternRecognizer
+
+from app.config import get_settings
+from app.services.analyzer import AnalyzerService
+from benchmarks.corpus import make_corpus, make_document
+
+
+def _pattern_recognizers(engine, language):
+    return [
+        r for r in engine.registry.get_recognizers(language=language, all_fields=True)
+        if isinstance(r, PatternRecognizer)
+    ]
+
+
+def _scan(engine, language, texts) -> float:
+    recognizers = _pattern_recognizers(engine, language)
+    entities = engine.get_supported_entities(language=language)
+    start = time.perf_counter()
+    for text in texts:
+        for recognizer in recognizers:
+            recognizer.analyze(text, entities, None)
+    return time.perf_counter() - start
+
+
+def _signature(engine, language, texts):
+    return [
+        sorted((r.entity_type, r.start, r.end, round(r.score, 4)) for r in engine.analyze(text=text, language=language))
+        for text in texts
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock per-recognizer regex scanning vs the compiled, prefiltered matcher")
+    parser.add_argument("--language", type=str, default="en", help="Language to benchmark")
+    parser.add_argument("--segments", type=int, default=5000, help="Short MT segments")
+    parser.add_argument("--document-bytes", type=int, nargs="+", default=[100_000, 1_000_000], help="Long document sizes")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    stock = AnalyzerService(settings.model_copy(update={"pattern_matcher": "stock"})).engine
+    compiled = AnalyzerService(settings.model_copy(update={"pattern_matcher": "compiled"})).engine
+
+    rng = random.Random(0)
+    segments = [text for text, _ in make_corpus(args.segments, languages=(args.language,))]
+    workloads = {"segments": segments}
+    for size in args.document_bytes:
+        workloads[f"document_{size}"] = [make_document(rng, args.language, size)]
+
+    report = {"mismatches": sum(
+        a != b for a, b in zip(_signature(stock, args.language, segments[:500]), _signature(compiled, args.language, segments[:500]))
+    )}
+    for name, texts in workloads.items():
+        stock_seconds = _scan(stock, args.language, texts)
+        compiled_seconds = _scan(compiled, args.language, texts)
+        report[name] = {
+            "stock_ms": round(stock_seconds * 1000, 1),
+            "compiled_ms": round(compiled_seconds * 1000, 1),
+            "speedup": round(stock_seconds / compiled_seconds, 2),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
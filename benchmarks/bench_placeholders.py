@@ -0,0 +1,76 @@
+import argparse
+import json
+import random
+import time
+
+from presidio_analyzer import RecognizerResult
+from presidio_anonymizer import AnonymizerEngine
+from presidio_anonymizer.entities import OperatorConfig
+
+from app.services.translation_anonymizer import build_placeholders
+
+ENTITY_TYPES = ["PERSON", "EMAIL_ADDRESS", "PHONE_NUMBER", "LOCATION"]
+
+
+def make_dense_document(size_bytes: int, entities: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+    text = []
+    length = 0
+    while length < size_bytes:
+        word = rng.choice(words)
+        text.append(word)
+        length += len(word) + 1
+    text = " ".join(text)
+
+    starts = sorted(rng.sample(range(0, len(text) - 20, 20), entities))
+    spans = [
+        RecognizerResult(rng.choice(ENTITY_TYPES), start, start + rng.randint(5, 15), 0.85)
+        for start in starts
+    ]
+    return text, spans
+
+
+def legacy_placeholders(anonymizer: AnonymizerEngine, text: str, spans):
+    operators = {
+        res.entity_type: OperatorConfig("replace", {"new_value": f"<{res.entity_type}>"})
+        for res in spans
+    }
+    anonymized_text = anonymizer.anonymize(text=text, analyzer_results=spans, operators=operators).text
+    for idx, res in enumerate(spans):
+        anonymized_text = anonymized_text.replace(f"<{res.entity_type}>", f"<{res.entity_type}_{idx}>", 1)
+    return anonymized_text
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generic replace + str.replace loop vs single-pass placeholder builder")
+    parser.add_argument("--size", type=int, default=100_000, help="Document size in bytes")
+    parser.add_argument("--entities", type=int, nargs="+", default=[100, 500, 2000], help="Entity counts")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions per measurement")
+    args = parser.parse_args()
+
+    anonymizer = AnonymizerEngine()
+    report = []
+    for entities in args.entities:
+        text, spans = make_dense_document(args.size, entities)
+        legacy = timed(lambda: legacy_placeholders(anonymizer, text, spans), args.repeat)
+        single_pass = timed(lambda: build_placeholders(text, spans), args.repeat)
+        report.append({
+            "size_bytes": len(text),
+            "entities": entities,
+            "legacy_ms": round(legacy * 1000, 3),
+            "single_pass_ms": round(single_pass * 1000, 3),
+            "speedup": round(legacy / single_pass, 1),
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
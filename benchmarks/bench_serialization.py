@@ -0,0 +1,107 @@
+import argparse
+import json
+import re
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from presidio_analyzer import RecognizerResult
+from pydantic import TypeAdapter
+
+from app.models.analysis import EntityResult
+from app.routers.translation import AnonymizationResponse
+from app.services import wire
+from app.services.analyzer import entity_row
+from benchmarks.corpus import CITIES, NAMES, make_corpus
+from app.services.translation_anonymizer import build_placeholders
+
+ENTITY_PATTERNS = {
+    "PERSON": "|".join(re.escape(name) for names in NAMES.values() for name in names),
+    "LOCATION": "|".join(re.escape(city) for cities in CITIES.values() for city in cities),
+    "EMAIL_ADDRESS": r"[a-z]+@example\.com",
+    "PHONE_NUMBER": r"\+1 212-555-\d{4}",
+    "CREDIT_CARD": r"4111 1111 1111 1111",
+    "URL": r"https://[a-z]+\.example\.org/profile",
+}
+ENTITY_RE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in ENTITY_PATTERNS.items()))
+
+
+def make_spans(text: str) -> List[RecognizerResult]:
+    return [RecognizerResult(match.lastgroup, match.start(), match.end(), 0.85) for match in ENTITY_RE.finditer(text)]
+
+
+def make_batch(segments: int, seed: int) -> List[dict]:
+    results = []
+    for text, _ in make_corpus(segments, seed=seed):
+        anonymized_text, mappings = build_placeholders(text, make_spans(text))
+        results.append({"anonymized_text": anonymized_text, "mappings": mappings})
+    return results
+
+
+def fastapi_json(adapter: TypeAdapter, content) -> bytes:
+    # What a response_model route does: validate, serialize, then JSONResponse.
+    value = adapter.dump_python(adapter.validate_python(content), mode="json")
+    return json.dumps(jsonable_encoder(value), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def measure(name: str, encode, decode, repeat: int) -> dict:
+    encode_seconds, body = timed(encode, repeat)
+    decode_seconds, _ = timed(lambda: decode(body), repeat)
+    return {
+        "case": name,
+        "encode_ms": round(encode_seconds * 1000, 2),
+        "decode_ms": round(decode_seconds * 1000, 2),
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization: response_model + json vs orjson/msgpack, row vs columnar")
+    parser.add_argument("--segments", type=int, default=10_000, help="Segments per batch response")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement (best is reported)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    args = parser.parse_args()
+
+    batch = make_batch(args.segments, args.seed)
+    spans = [span for result in batch for span in make_spans(" ".join(m["original"] for m in result["mappings"]))]
+    batch_adapter = TypeAdapter(List[AnonymizationResponse])
+    entity_adapter = TypeAdapter(List[EntityResult])
+
+    cases = [
+        ("batch rows: response_model + json", lambda: fastapi_json(batch_adapter, batch), json.loads),
+        ("analyze: EntityResult(**to_dict()) + response_model + json",
+         lambda: fastapi_json(entity_adapter, [EntityResult(**span.to_dict()) for span in spans]), json.loads),
+    ]
+    formats = [("orjson" if wire.orjson is not None else "json", wire.dump_json, json.loads)]
+    if wire.msgpack is not None:
+        formats.append(("msgpack", lambda c: wire.msgpack.packb(c, use_bin_type=True), wire.msgpack.unpackb))
+    for label, encode, decode in formats:
+        cases += [
+            (f"batch rows: {label}", lambda encode=encode: encode(batch), decode),
+            (f"batch columnar: {label}", lambda encode=encode: encode(wire.columnar_translation(batch)), decode),
+            (f"analyze rows: entity_row + {label}", lambda encode=encode: encode([entity_row(s) for s in spans]), decode),
+            (f"analyze columnar: {label}",
+             lambda encode=encode: encode(wire.columnar_entities(entity_row(s) for s in spans)), decode),
+        ]
+
+    report = {
+        "segments": len(batch),
+        "mappings": sum(len(result["mappings"]) for result in batch),
+        "entities": len(spans),
+        "json_encoder": "orjson" if wire.orjson is not None else "json",
+        "results": [measure(name, encode, decode, args.repeat) for name, encode, decode in cases],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
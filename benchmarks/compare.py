@@ -0,0 +1,59 @@
+import argparse
+import json
+import sys
+
+# metric -> True when a larger value is better
+METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "segments_per_sec": True,
+}
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> dict:
+    rows = {}
+    regressions = []
+    for name, base in baseline["results"].items():
+        current = candidate["results"].get(name)
+        if current is None:
+            continue
+        row = {}
+        for metric, higher_is_better in METRICS.items():
+            before, after = base.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            row[metric] = {"baseline": before, "candidate": after, "change_pct": round(change * 100, 1)}
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{name} {metric}")
+        rows[name] = row
+    return {
+        "baseline": baseline.get("meta", {}).get("commit"),
+        "candidate": candidate.get("meta", {}).get("commit"),
+        "threshold_pct": round(threshold * 100, 1),
+        "missing": sorted(set(baseline["results"]) - set(candidate["results"])),
+        "regressions": regressions,
+        "results": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports and flag regressions")
+    parser.add_argument("baseline", type=str, help="Report from the reference commit")
+    parser.add_argument("candidate", type=str, help="Report from the commit under test")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    report = compare(baseline, candidate, args.threshold / 100)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import random
+from typing import List, Tuple
+
+NAMES = {
+    "en": ["John Smith", "Mary Johnson", "Robert Brown", "Linda Davis", "Michael Wilson"],
+    "ru": ["Иван Петров", "Анна Смирнова", "Сергей Иванов", "Ольга Кузнецова", "Дмитрий Соколов"],
+    "xx": ["Jean Dupont", "Hans Müller", "Giulia Rossi", "Carlos García", "Piotr Nowak"],
+}
+
+CITIES = {
+    "en": ["London", "New York", "Chicago", "Boston", "Seattle"],
+    "ru": ["Москва", "Санкт-Петербург", "Казань", "Новосибирск", "Екатеринбург"],
+    "xx": ["Paris", "Berlin", "Roma", "Madrid", "Warszawa"],
+}
+
+FILLER = {
+    "en": [
+        "Please review the attached document before the meeting.",
+        "The delivery was scheduled for next week.",
+        "Our team will follow up with the remaining questions.",
+        "Click Save to apply the changes.",
+    ],
+    "ru": [
+        "Пожалуйста, ознакомьтесь с документом до встречи.",
+        "Доставка запланирована на следующую неделю.",
+        "Наша команда ответит на оставшиеся вопросы.",
+        "Нажмите «Сохранить», чтобы применить изменения.",
+    ],
+    "xx": [
+        "Merci de vérifier le document avant la réunion.",
+        "Die Lieferung ist für nächste Woche geplant.",
+        "Il nostro team risponderà alle domande.",
+        "Haga clic en Guardar para aplicar los cambios.",
+    ],
+}
+
+TEMPLATES = [
+    "{name} lives in {city}.",
+    "Contact {name} at {email} or {phone}.",
+    "Send the invoice to {email}.",
+    "Card {card} was charged by {name}.",
+    "Visit {url} for details.",
+]
+
+
+def _pii(rng: random.Random, language: str) -> str:
+    user = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(8))
+    return rng.choice(TEMPLATES).format(
+        name=rng.choice(NAMES[language]),
+        city=rng.choice(CITIES[language]),
+        email=f"{user}@example.com",
+        phone=f"+1 212-555-{rng.randint(1000, 9999)}",
+        card="4111 1111 1111 1111",
+        url=f"https://{user}.example.org/profile",
+    )
+
+
+def make_segment(rng: random.Random, language: str, sentences: int = 2, pii_density: float = 0.5) -> str:
+    parts = []
+    for _ in range(sentences):
+        if rng.random() < pii_density:
+            parts.append(_pii(rng, language))
+        else:
+            parts.append(rng.choice(FILLER[language]))
+    return " ".join(parts)
+
+
+def make_corpus(
+    size: int,
+    languages: Tuple[str, ...] = ("en", "ru", "xx"),
+    max_sentences: int = 3,
+    pii_density: float = 0.5,
+    seed: int = 0,
+) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        language = rng.choice(languages)
+        sentences = rng.randint(1, max_sentences)
+        corpus.append((make_segment(rng, language, sentences, pii_density), language))
+    return corpus
+
+
+def make_document(rng: random.Random, language: str, size_bytes: int, pii_density: float = 0.5) -> str:
+    parts = []
+    total = 0
+    while total < size_bytes:
+        paragraph = make_segment(rng, language, rng.randint(3, 8), pii_density)
+        parts.append(paragraph)
+        total += len(paragraph.encode("utf-8")) + 2
+    return "\n\n".join(parts)
@@ -0,0 +1,140 @@
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List
+from urllib.parse import urlsplit
+
+from benchmarks.corpus import make_corpus
+from benchmarks.stats import metadata, summarize, write_report
+
+
+def _single(corpus, i):
+    text, language = corpus[i % len(corpus)]
+    return "/anonymize", {"text": text, "language": language}, 1
+
+
+def _batch(corpus, i, size):
+    start = (i * size) % len(corpus)
+    items = [corpus[(start + k) % len(corpus)] for k in range(size)]
+    return "/anonymize/batch", [{"text": t, "language": lang} for t, lang in items], size
+
+
+def _system(corpus, i):
+    text, language = corpus[i % len(corpus)]
+    return "/system/analyze", {"text": text, "language": language}, 1
+
+
+def _wait_ready(url: str, timeout: float) -> None:
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            conn.request("GET", "/ready")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Service at {url} did not become ready within {timeout}s")
+
+
+def _run_endpoint(url: str, make_request, requests: int, concurrency: int) -> Dict:
+    parts = urlsplit(url)
+    counter = iter(range(requests))
+    lock = threading.Lock()
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    segments = 0
+
+    def worker():
+        nonlocal segments
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=300)
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            path, payload, size = make_request(i)
+            body = json.dumps(payload).encode("utf-8")
+            begin = time.perf_counter()
+            try:
+                conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=300)
+                status = "error"
+            elapsed = time.perf_counter() - begin
+            with lock:
+                statuses[str(status)] += 1
+                if status == 200:
+                    latencies.append(elapsed)
+                    segments += size
+        conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = summarize(latencies, segments, time.perf_counter() - start)
+    result["statuses"] = dict(statuses)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load generator for the single, batch and system endpoints")
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8000", help="Service base URL")
+    parser.add_argument("--start", action="store_true", help="Start the app locally on the --url port for the run")
+    parser.add_argument("--endpoints", type=str, nargs="+", default=["single", "batch", "system"], choices=["single", "batch", "system"])
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent connections")
+    parser.add_argument("--batch-size", type=int, default=32, help="Segments per batch request")
+    parser.add_argument("--segments", type=int, default=2000, help="Corpus size")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--output", type=str, default=None, help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.segments, seed=args.seed)
+    requests: Dict[str, Callable] = {
+        "single": lambda i: _single(corpus, i),
+        "batch": lambda i: _batch(corpus, i, args.batch_size),
+        "system": lambda i: _system(corpus, i),
+    }
+
+    server = None
+    if args.start:
+        port = urlsplit(args.url).port or 8000
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app.main", "--host", "127.0.0.1", "--port", str(port)],
+            env=dict(os.environ, LOG_LEVEL="WARNING"),
+        )
+    try:
+        _wait_ready(args.url, timeout=300)
+        results = {}
+        for name in args.endpoints:
+            # A short warm-up so lazy pipeline setup doesn't land in the percentiles.
+            _run_endpoint(args.url, requests[name], min(args.concurrency * 2, args.requests), args.concurrency)
+            results[f"http.{name}/c{args.concurrency}"] = _run_endpoint(
+                args.url, requests[name], args.requests, args.concurrency
+            )
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    write_report({"meta": metadata(vars(args)), "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
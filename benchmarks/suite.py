@@ -0,0 +1,123 @@
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+from app.config import get_settings
+from app.models.analysis import AnalyzeRequest
+from app.models.anonymization import AnonymizeRequest, DeanonymizeEntity, DeanonymizeRequest
+from app.services.analyzer import AnalyzerService
+from app.services.anonymizer import AnonymizerService
+from app.services.translation_anonymizer import TranslationAnonymizerService
+from benchmarks.corpus import make_corpus, make_document
+from benchmarks.stats import metadata, summarize, write_report
+
+ENCRYPT_KEY = "WmZq4t7w!z%C&F)J"
+
+# name -> (max sentences per segment, PII density)
+WORKLOADS = {
+    "short": (3, 0.5),
+    "long": (20, 0.5),
+    "dense": (3, 0.9),
+    "clean": (3, 0.0),
+}
+
+
+def _operators(kind: str) -> Dict:
+    # OperatorConfig.from_json pops "type", so every request needs its own copy.
+    return {"DEFAULT": {"type": kind, "key": ENCRYPT_KEY}}
+
+
+def _timed(items: List, call: Callable, segments: int = None) -> Dict:
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        begin = time.perf_counter()
+        call(item)
+        latencies.append(time.perf_counter() - begin)
+    return summarize(latencies, segments or len(items), time.perf_counter() - start)
+
+
+def _corpora(segments: int, languages: Tuple[str, ...], seed: int, documents: List[int]) -> Dict[str, List[Tuple[str, str]]]:
+    corpora = {
+        name: make_corpus(segments, languages, max_sentences, density, seed)
+        for name, (max_sentences, density) in WORKLOADS.items()
+    }
+    rng = random.Random(seed)
+    for size in documents:
+        corpora[f"document_{size}"] = [(make_document(rng, language, size), language) for language in languages]
+    return corpora
+
+
+def run_suite(args) -> Dict:
+    settings = get_settings()
+    analyzer = AnalyzerService(settings)
+    anonymizer = AnonymizerService()
+    translation = TranslationAnonymizerService(
+        analyzer_engine=analyzer.engine,
+        anonymizer_engine=anonymizer.anonymizer,
+        batch_size=settings.nlp_batch_size,
+        n_process=settings.nlp_n_process,
+        nlp_profile=settings.nlp_profile,
+        chunk_threshold=settings.chunk_threshold,
+        chunk_size=settings.chunk_size,
+        chunk_overlap=settings.chunk_overlap,
+    )
+    results = {}
+    for name, corpus in _corpora(args.segments, tuple(args.languages), args.seed, args.document_bytes).items():
+        # Warm up lazily initialized pipeline components outside the timings.
+        for text, language in corpus[:min(len(corpus), 20)]:
+            translation.analyze_and_anonymize(text, language)
+
+        analyze_requests = [AnalyzeRequest(text=text, language=language) for text, language in corpus]
+        results[f"analyzer.analyze/{name}"] = _timed(analyze_requests, analyzer.analyze)
+
+        anonymize_requests = [
+            AnonymizeRequest(
+                text=req.text,
+                analyzer_results=analyzer.analyze(req),
+                anonymizers=_operators("encrypt"),
+            )
+            for req in analyze_requests
+        ]
+        results[f"anonymizer.anonymize/{name}"] = _timed(anonymize_requests, anonymizer.anonymize)
+
+        deanonymize_requests = []
+        for req in anonymize_requests:
+            anonymized = anonymizer.anonymize(req.model_copy(update={"anonymizers": _operators("encrypt")}))
+            deanonymize_requests.append(DeanonymizeRequest(
+                text=anonymized["text"],
+                entities=[
+                    DeanonymizeEntity(**{k: item[k] for k in ("start", "end", "entity_type", "text")})
+                    for item in anonymized["items"] or []
+                ],
+                deanonymizers=_operators("decrypt"),
+            ))
+        results[f"anonymizer.deanonymize/{name}"] = _timed(deanonymize_requests, anonymizer.deanonymize)
+
+        results[f"translation.analyze_and_anonymize/{name}"] = _timed(
+            corpus, lambda item: translation.analyze_and_anonymize(*item)
+        )
+        if not name.startswith("document_"):
+            chunks = [corpus[i:i + args.batch] for i in range(0, len(corpus), args.batch)]
+            results[f"translation.analyze_and_anonymize_batch/{name}"] = _timed(
+                chunks, translation.analyze_and_anonymize_batch, len(corpus)
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process latency/throughput suite for the analyzer, anonymizer and translation services")
+    parser.add_argument("--segments", type=int, default=500, help="Segments per workload")
+    parser.add_argument("--languages", type=str, nargs="+", default=["en", "ru", "xx"], help="Corpus languages")
+    parser.add_argument("--document-bytes", type=int, nargs="*", default=[100_000], help="Long document sizes, one document per language")
+    parser.add_argument("--batch", type=int, default=64, help="Segments per batch call")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--output", type=str, default=None, help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    write_report({"meta": metadata(vars(args)), "results": run_suite(args)}, args.output)
+
+
+if __name__ == "__main__":
+    main()
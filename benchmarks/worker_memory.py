@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import json
+
+from app.config import get_settings
+from app.services import workers
+from app.services.executor import AnalysisExecutor
+from app.services.memory import process_memory
+from benchmarks.corpus import make_corpus
+
+
+async def _exercise(executor: AnalysisExecutor, corpus, chunk: int) -> None:
+    await asyncio.gather(*[
+        executor.run(workers.translation_anonymize_batch, corpus[i:i + chunk])
+        for i in range(0, len(corpus), chunk)
+    ])
+
+
+def measure(start_method: str, max_workers: int, corpus) -> dict:
+    executor = AnalysisExecutor(
+        kind="process",
+        max_workers=max_workers,
+        max_queue=len(corpus),
+        initializer=workers.init_worker,
+        start_method=start_method,
+    )
+    executor.start()
+    asyncio.run(_exercise(executor, corpus, max(len(corpus) // (max_workers * 4), 1)))
+
+    per_worker = [process_memory(pid) for pid in executor.worker_pids()]
+    executor.shutdown()
+    return {
+        "start_method": start_method,
+        "workers": per_worker,
+        "worker_rss_mb": round(sum(m.get("rss", 0) for m in per_worker) / 2**20, 1),
+        "worker_pss_mb": round(sum(m.get("pss", 0) for m in per_worker) / 2**20, 1),
+        "worker_private_mb": round(sum(m.get("private", 0) for m in per_worker) / 2**20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS/PSS per analysis worker: fork-after-load vs spawn")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes")
+    parser.add_argument("--segments", type=int, default=500, help="Segments analyzed to touch the models")
+    args = parser.parse_args()
+
+    workers.register_services(workers.load_services(get_settings()))
+    corpus = make_corpus(args.segments)
+
+    report = {
+        "parent_mb": round(process_memory().get("rss", 0) / 2**20, 1),
+        "runs": [measure(method, args.workers, corpus) for method in ("fork", "spawn")],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()